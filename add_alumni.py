@@ -3,6 +3,8 @@ import time
 import requests
 from neo4j import GraphDatabase
 import os 
+from alumni_clustering import assign_new_alumni
+from corpus_version import bump_corpus_version
 
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
@@ -61,13 +63,15 @@ class GraphDB:
             print("Skipping record: 'name' is missing.")
             return None
         query = (
-            "MERGE (s:alumni {name: $name}) "
-            "SET s += $props "
+            "MERGE (s:Student {name: $name}) "
+            "SET s += $props, s.corpus_version = $version, s.updated_at = timestamp() "
             "RETURN s"
         )
+        # Record the change so the API picks it up (see corpus_version.py).
+        version = bump_corpus_version(tx)
         props = alumni_info.copy()
         props.pop("name", None)
-        result = tx.run(query, name=name, props=props)
+        result = tx.run(query, name=name, props=props, version=version)
         record = result.single()
         return record[0] if record else None
 
@@ -77,7 +81,7 @@ class GraphDB:
         Returns a set of names.
         """
         with self.driver.session() as session:
-            query = "MATCH (s:alumni) RETURN s.name as name"
+            query = "MATCH (s:Student) RETURN s.name as name"
             names = set()
             result = session.run(query)
             for record in result:
@@ -94,6 +98,7 @@ def main():
     
     # Fetch current alumni names from the database
     existing_names = db.fetch_alumni_names()
+    added_profiles = []
     
     for name in new_names:
         if name in existing_names:
@@ -106,11 +111,16 @@ def main():
                 db.add_alumni(info, fallback_name=name)
                 # Update the existing names set to include the new entry
                 existing_names.add(name)
+                added_profiles.append({**info, "name": info.get("name") or name})
                 time.sleep(1)  # Pause to avoid API rate limits
             else:
                 print(f"No data found for {name}.")
     
     db.close()
+
+    # Place the new alumni in the existing clusters without refitting.
+    if added_profiles:
+        assign_new_alumni(added_profiles)
     print("Database update complete.")
 
 if __name__ == "__main__":
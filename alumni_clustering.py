@@ -0,0 +1,241 @@
+import numpy as np
+from neo4j import GraphDatabase
+from corpus_version import bump_corpus_version, stamp_alumni
+from profile_fields import EXCLUDED_FIELDS, PLACEHOLDER_VALUES
+
+# ====== Neo4j Connection Configuration ======
+NEO4J_URI = "bolt://localhost:7687"
+NEO4J_USER = "neo4j"
+NEO4J_PASSWORD = "password"
+
+# ====== Clustering Configuration ======
+NUM_CLUSTERS = 32        # Number of centroids (k)
+BATCH_SIZE = 1024        # Embeddings sampled per mini-batch update
+NUM_ITERATIONS = 100     # Mini-batch updates performed during a fit
+WRITE_BATCH_SIZE = 1000  # Nodes updated per Neo4j transaction
+CENTROIDS_FILE = "./output/cluster_centroids.npy"
+
+# The Sentence Transformer model is only loaded when embeddings are needed, so
+# importing this module (e.g. from add_alumni.py) stays cheap.
+model = None
+
+def get_model():
+    global model
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+    return model
+
+class GraphDB:
+    def __init__(self, uri, user, password):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+
+    def close(self):
+        self.driver.close()
+
+    def fetch_alumni_profiles(self, label="Student"):
+        """
+        Fetch all alumni nodes with the given label.
+        Returns a list of dictionaries.
+        """
+        query = f"MATCH (s:{label}) RETURN s {{.*, embedding: null}} AS s"
+        profiles = []
+        with self.driver.session() as session:
+            result = session.run(query)
+            for record in result:
+                node = {key: value for key, value in record["s"].items() if value is not None}
+                if node.get("name"):
+                    profiles.append(node)
+        return profiles
+
+    def write_cluster_ids(self, rows, label="Student"):
+        """
+        Store the cluster ID on each alumni node. `rows` is a list of
+        {"name": ..., "cluster_id": ...} dictionaries, written in batches of
+        WRITE_BATCH_SIZE with a single UNWIND per transaction. Only nodes
+        whose cluster ID changed are written; they are stamped with one new
+        corpus version at the end, so a refit that moves few alumni makes
+        the API reload only those.
+        Returns the number of nodes whose cluster ID changed.
+        """
+        changed = []
+        with self.driver.session() as session:
+            for start in range(0, len(rows), WRITE_BATCH_SIZE):
+                batch = rows[start:start + WRITE_BATCH_SIZE]
+                changed.extend(session.execute_write(self._write_cluster_ids_tx, batch, label))
+            if changed:
+                session.execute_write(self._stamp_changed_tx, changed, label)
+        return len(changed)
+
+    @staticmethod
+    def _write_cluster_ids_tx(tx, rows, label):
+        query = (
+            "UNWIND $rows AS row "
+            f"MATCH (s:{label} {{name: row.name}}) "
+            "WHERE s.cluster_id IS NULL OR s.cluster_id <> row.cluster_id "
+            "SET s.cluster_id = row.cluster_id "
+            "RETURN collect(s.name) AS names"
+        )
+        record = tx.run(query, rows=rows).single()
+        return record["names"] if record else []
+
+    @staticmethod
+    def _stamp_changed_tx(tx, names, label):
+        version = bump_corpus_version(tx)
+        for start in range(0, len(names), WRITE_BATCH_SIZE):
+            stamp_alumni(tx, names[start:start + WRITE_BATCH_SIZE], version, label)
+
+def build_profile_description(alumni):
+    """
+    Construct a full profile description by concatenating key-value pairs
+    that are populated. Exclude the EXCLUDED_FIELDS.
+    """
+    parts = []
+    for key, value in alumni.items():
+        if value is not None:
+            str_val = str(value).strip()
+            if key.lower() not in EXCLUDED_FIELDS and str_val and str_val.lower() not in PLACEHOLDER_VALUES:
+                parts.append(f"{key}: {str_val}")
+    return " ".join(parts)
+
+def get_alumni_embeddings(alumnis):
+    """
+    Compute embeddings for each alumni's full profile description.
+    Returns a NumPy array of normalized embeddings (float32).
+    """
+    descriptions = [build_profile_description(s) for s in alumnis]
+    embeddings = get_model().encode(descriptions)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = embeddings / norms
+    return np.array(embeddings).astype('float32')
+
+def fit_centroids(embeddings, num_clusters=NUM_CLUSTERS, batch_size=BATCH_SIZE,
+                  num_iterations=NUM_ITERATIONS, seed=0):
+    """
+    Fit cluster centroids with mini-batch spherical k-means.
+    Each iteration assigns a random mini-batch to its nearest centroid with a
+    FAISS inner-product search and moves every touched centroid towards the
+    batch mean with a per-centroid learning rate (1 / points seen so far).
+    Centroids are kept unit length so inner product equals cosine similarity.
+    Cost is O(iterations * batch_size * k) regardless of the corpus size.
+    Returns a (k, dim) float32 array.
+    """
+    import faiss
+
+    rng = np.random.default_rng(seed)
+    n, dim = embeddings.shape
+    k = min(num_clusters, n)
+    centroids = embeddings[rng.choice(n, k, replace=False)].astype('float32')
+    seen = np.zeros(k, dtype=np.int64)
+
+    for _ in range(num_iterations):
+        batch = embeddings[rng.choice(n, min(batch_size, n), replace=False)]
+        index = faiss.IndexFlatIP(dim)
+        index.add(centroids)
+        _, assigned = index.search(batch, 1)
+        assigned = assigned[:, 0]
+
+        batch_counts = np.bincount(assigned, minlength=k)
+        sums = np.zeros((k, dim), dtype='float32')
+        np.add.at(sums, assigned, batch)
+        seen += batch_counts
+
+        touched = batch_counts > 0
+        learning_rate = batch_counts[touched] / seen[touched]
+        batch_means = sums[touched] / batch_counts[touched][:, None]
+        centroids[touched] += learning_rate[:, None] * (batch_means - centroids[touched])
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    return centroids.astype('float32')
+
+def assign_clusters(embeddings, centroids):
+    """
+    Assign every embedding to its nearest centroid in one FAISS search.
+    Returns an array of cluster IDs.
+    """
+    import faiss
+
+    index = faiss.IndexFlatIP(centroids.shape[1])
+    index.add(centroids)
+    _, assigned = index.search(embeddings, 1)
+    return assigned[:, 0]
+
+def assign_cluster(embedding, centroids):
+    """
+    Assign a single normalized embedding to its nearest centroid in O(k).
+    """
+    return int(np.argmax(centroids @ embedding))
+
+def save_centroids(centroids, path=CENTROIDS_FILE):
+    np.save(path, centroids)
+
+def load_centroids(path=CENTROIDS_FILE):
+    """
+    Load previously fitted centroids, or return None if no fit has been stored yet.
+    """
+    try:
+        return np.load(path)
+    except FileNotFoundError:
+        return None
+
+def fit_and_store_clusters(num_clusters=NUM_CLUSTERS):
+    """
+    Fit centroids over the full corpus, store the cluster ID on every
+    'Student' node in bulk and persist the centroids for later assignment.
+    Returns the list of cluster IDs in profile order.
+    """
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    profiles = db.fetch_alumni_profiles()
+    if not profiles:
+        db.close()
+        print("No alumni nodes found in the database.")
+        return []
+
+    print(f"Embedding {len(profiles)} alumni profiles...")
+    embeddings = get_alumni_embeddings(profiles)
+    print(f"Fitting {min(num_clusters, len(profiles))} centroids...")
+    centroids = fit_centroids(embeddings, num_clusters=num_clusters)
+    labels = assign_clusters(embeddings, centroids)
+
+    rows = [{"name": p["name"], "cluster_id": int(label)} for p, label in zip(profiles, labels)]
+    updated = db.write_cluster_ids(rows)
+    db.close()
+
+    save_centroids(centroids)
+    print(f"Cluster IDs changed on {updated} of {len(rows)} nodes; centroids saved to '{CENTROIDS_FILE}'.")
+    return labels
+
+def assign_new_alumni(profiles, label="Student"):
+    """
+    Assign newly added alumni to the nearest stored centroid without refitting,
+    and write their cluster IDs. Does nothing if no centroids have been fitted yet.
+    Returns the list of cluster IDs assigned.
+    """
+    centroids = load_centroids()
+    if centroids is None:
+        print("No fitted centroids found; run alumni_clustering.py to assign clusters.")
+        return []
+    profiles = [p for p in profiles if p.get("name")]
+    if not profiles:
+        return []
+
+    embeddings = get_alumni_embeddings(profiles)
+    labels = [assign_cluster(emb, centroids) for emb in embeddings]
+    rows = [{"name": p["name"], "cluster_id": label_id} for p, label_id in zip(profiles, labels)]
+
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    db.write_cluster_ids(rows, label=label)
+    db.close()
+    return labels
+
+def main():
+    labels = fit_and_store_clusters()
+    if len(labels) == 0:
+        return
+    ids, counts = np.unique(labels, return_counts=True)
+    print("\nCluster sizes:")
+    for cluster_id, count in zip(ids, counts):
+        print(f"cluster {cluster_id}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ from openai import OpenAI
 import openai
 import json
 from neo4j import GraphDatabase
+from corpus_version import bump_corpus_version
 
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
@@ -94,13 +95,14 @@ class GraphDB:
 
     @staticmethod
     def _update_description(tx, name, description):
+        version = bump_corpus_version(tx)
         result = tx.run(
             query="""
                 MATCH (s:Student {name: $name})
-                SET s.description = $description
+                SET s.description = $description, s.corpus_version = $version, s.updated_at = timestamp()
                 RETURN s
             """,
-            name=name, description=description
+            name=name, description=description, version=version
         )
         record = result.single()
         return record[0] if record else None
\ No newline at end of file
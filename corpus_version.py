@@ -0,0 +1,47 @@
+# Every write path records its change in a single metadata node,
+#   (:CorpusMeta {id: 'alumni', version: <int>, updated_at: <ms>}),
+# stamps the alumni it wrote with that version and leaves a (:RemovedAlumni)
+# tombstone for every alumni it deleted. The API polls the version and pulls
+# only what changed since the version it is serving (see flask_api/corpus_reload.py).
+#
+# All helpers run inside the caller's write transaction, so the version bump
+# commits (or rolls back) together with the write itself.
+
+CORPUS_ID = "alumni"
+
+def bump_corpus_version(tx):
+    """
+    Increment the corpus version and return the new value.
+    """
+    query = (
+        "MERGE (m:CorpusMeta {id: $corpus_id}) "
+        "ON CREATE SET m.version = 0 "
+        "SET m.version = m.version + 1, m.updated_at = timestamp() "
+        "RETURN m.version AS version"
+    )
+    return tx.run(query, corpus_id=CORPUS_ID).single()["version"]
+
+def stamp_alumni(tx, names, version, label="Student"):
+    """
+    Mark the given alumni as changed at `version`. For writes that only learn
+    from their own result which nodes they changed, and so bump the version
+    afterwards (schema_bootstrap.py, alumni_clustering.py); writes that know their nodes up front
+    set corpus_version in the same SET clause instead.
+    """
+    query = (
+        "UNWIND $names AS name "
+        f"MATCH (s:{label} {{name: name}}) "
+        "SET s.corpus_version = $version, s.updated_at = timestamp()"
+    )
+    tx.run(query, names=names, version=version)
+
+def record_removals(tx, names, version):
+    """
+    Leave a tombstone for each removed alumni so readers can drop them.
+    """
+    query = (
+        "UNWIND $names AS name "
+        "MERGE (t:RemovedAlumni {name: name}) "
+        "SET t.corpus_version = $version, t.removed_at = timestamp()"
+    )
+    tx.run(query, names=names, version=version)
@@ -0,0 +1,242 @@
+# Entity resolution for Student nodes that describe the same person under
+# different names (e.g. "poppy stowell-evans" from a Yalies lookup and
+# "Poppy Stowell-Evans" from a class list).
+#
+# Candidate pairs come from two near-linear sources instead of comparing every
+# pair of alumni:
+#   - blocking keys: the normalized name, first + last name token, and the
+#     email local part / domain; blocks larger than MAX_BLOCK_SIZE are skipped,
+#   - an HNSW index over the profile embeddings (ANN_NEIGHBORS per profile).
+# Each candidate is scored on name, email and profile similarity (different
+# class years or email addresses veto a match, and without a shared email the
+# name and profile must be near-identical); pairs above
+# MATCH_THRESHOLD are grouped complete-link (every pair within a group must
+# match) and every group is merged into its most complete node,
+# MERGE_BATCH_SIZE groups per Neo4j transaction. Merged names are kept in the
+# `aliases` property and tombstoned for the API.
+#
+# python dedupe_alumni.py [--dry-run]
+import re
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+from neo4j import GraphDatabase
+
+from alumni_clustering import get_alumni_embeddings
+from corpus_version import bump_corpus_version, record_removals
+
+# ====== Neo4j Connection Configuration ======
+NEO4J_URI = "bolt://localhost:7687"
+NEO4J_USER = "neo4j"
+NEO4J_PASSWORD = "password"
+
+# ====== Deduplication Configuration ======
+MAX_BLOCK_SIZE = 50         # larger blocks (e.g. a very common surname) are not compared
+ANN_NEIGHBORS = 5
+ANN_MIN_SIMILARITY = 0.9    # embedding neighbours below this are not candidates
+MATCH_THRESHOLD = 0.85
+MERGE_BATCH_SIZE = 200
+# Score weights; a shared email address is a match on its own.
+NAME_WEIGHT = 0.7
+PROFILE_WEIGHT = 0.3
+# Merging deletes nodes, so without a shared email both the name and the
+# profile must be near-identical ("michael chen" vs "michael cheng" is 0.96).
+MIN_NAME_SIMILARITY = 0.97
+MIN_PROFILE_SIMILARITY = 0.9
+
+class GraphDB:
+    def __init__(self, uri, user, password):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+
+    def close(self):
+        self.driver.close()
+
+    def fetch_alumni_profiles(self):
+        query = "MATCH (s:Student) RETURN s {.*, embedding: null} AS s"
+        with self.driver.session() as session:
+            profiles = []
+            for record in session.run(query):
+                node = {key: value for key, value in record["s"].items() if value is not None}
+                if node.get("name"):
+                    profiles.append(node)
+            return profiles
+
+    def merge_duplicates(self, merges):
+        """
+        Apply {"keep", "duplicates", "props"} merges in batches. Returns the
+        number of nodes removed.
+        """
+        removed = 0
+        with self.driver.session() as session:
+            for start in range(0, len(merges), MERGE_BATCH_SIZE):
+                removed += session.execute_write(self._merge_duplicates_tx, merges[start:start + MERGE_BATCH_SIZE])
+        return removed
+
+    @staticmethod
+    def _merge_duplicates_tx(tx, merges):
+        version = bump_corpus_version(tx)
+        query = (
+            "UNWIND $merges AS merge "
+            "MATCH (keep:Student {name: merge.keep}) "
+            "SET keep += merge.props, keep.corpus_version = $version, keep.updated_at = timestamp() "
+            "WITH merge "
+            "UNWIND merge.duplicates AS duplicate_name "
+            "MATCH (duplicate:Student {name: duplicate_name}) "
+            "DETACH DELETE duplicate "
+            "RETURN count(duplicate) AS removed"
+        )
+        removed = tx.run(query, merges=merges, version=version).single()["removed"]
+        record_removals(tx, [name for merge in merges for name in merge["duplicates"]], version)
+        return removed
+
+def normalize_name(name):
+    """
+    Lower-case, accent-free name tokens ("Stowell-Evans" -> ["stowell", "evans"]).
+    """
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def email_parts(email):
+    if not email or "@" not in str(email):
+        return None, None
+    local, domain = str(email).lower().rsplit("@", 1)
+    return local.split("+")[0].replace(".", ""), domain
+
+def blocking_keys(profile):
+    tokens = normalize_name(profile["name"])
+    keys = []
+    if tokens:
+        keys.append("name:" + " ".join(sorted(tokens)))
+        keys.append(f"first_last:{tokens[0]}|{tokens[-1]}")
+    local, domain = email_parts(profile.get("email"))
+    if local:
+        keys.append(f"email:{local}")
+        if tokens:
+            keys.append(f"domain_last:{domain}|{tokens[-1]}")
+    return keys
+
+def blocked_pairs(profiles):
+    blocks = {}
+    for row, profile in enumerate(profiles):
+        for key in blocking_keys(profile):
+            blocks.setdefault(key, []).append(row)
+    pairs = set()
+    for rows in blocks.values():
+        if 1 < len(rows) <= MAX_BLOCK_SIZE:
+            pairs.update(combinations(rows, 2))
+    return pairs
+
+def ann_pairs(embeddings):
+    """
+    Pairs of near-identical profiles from an HNSW index, O(n log n).
+    """
+    import faiss
+
+    index = faiss.IndexHNSWFlat(embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+    index.add(embeddings)
+    similarities, neighbours = index.search(embeddings, ANN_NEIGHBORS + 1)
+    pairs = set()
+    for row, (row_similarities, row_neighbours) in enumerate(zip(similarities, neighbours)):
+        for similarity, other in zip(row_similarities, row_neighbours):
+            if other >= 0 and other != row and similarity >= ANN_MIN_SIMILARITY:
+                pairs.add((min(row, int(other)), max(row, int(other))))
+    return pairs
+
+def score_pair(a, b, profile_similarity):
+    """
+    Duplicate score in [0, 1]; 0 when the profiles contradict each other
+    (different class years or email addresses) or, without a shared email,
+    when the name or profile is not near-identical.
+    """
+    year_a, year_b = a.get("class_year"), b.get("class_year")
+    if year_a is not None and year_b is not None and year_a != year_b:
+        return 0.0
+    local_a, _ = email_parts(a.get("email"))
+    local_b, _ = email_parts(b.get("email"))
+    if local_a and local_b:
+        return 1.0 if local_a == local_b else 0.0
+    tokens_a, tokens_b = normalize_name(a["name"]), normalize_name(b["name"])
+    name_similarity = max(
+        SequenceMatcher(None, " ".join(tokens_a), " ".join(tokens_b)).ratio(),
+        SequenceMatcher(None, " ".join(sorted(tokens_a)), " ".join(sorted(tokens_b))).ratio(),
+    )
+    if name_similarity < MIN_NAME_SIMILARITY or profile_similarity < MIN_PROFILE_SIMILARITY:
+        return 0.0
+    return NAME_WEIGHT * name_similarity + PROFILE_WEIGHT * profile_similarity
+
+def find_duplicate_groups(profiles, embeddings):
+    """
+    Returns (groups of rows that describe the same person, candidates scored).
+    Groups are formed complete-link: candidate pairs are merged best first,
+    and two groups are only joined if every pair across them clears
+    MATCH_THRESHOLD, so A~B and B~C never pull in a C that A's class year
+    (or name) rules out.
+    """
+    candidates = blocked_pairs(profiles) | ann_pairs(embeddings)
+    scores = {}
+
+    def pair_score(a, b):
+        key = (min(a, b), max(a, b))
+        if key not in scores:
+            scores[key] = score_pair(profiles[a], profiles[b], float(embeddings[a] @ embeddings[b]))
+        return scores[key]
+
+    matches = sorted(((pair_score(a, b), a, b) for a, b in candidates), reverse=True)
+    group_of = list(range(len(profiles)))
+    members = {row: [row] for row in range(len(profiles))}
+    for score, a, b in matches:
+        if score < MATCH_THRESHOLD:
+            break
+        group_a, group_b = group_of[a], group_of[b]
+        if group_a == group_b:
+            continue
+        if all(pair_score(x, y) >= MATCH_THRESHOLD for x in members[group_a] for y in members[group_b]):
+            for row in members[group_a]:
+                group_of[row] = group_b
+            members[group_b].extend(members.pop(group_a))
+
+    return [rows for rows in members.values() if len(rows) > 1], len(candidates)
+
+def plan_merge(profiles, rows):
+    """
+    Keep the most complete node; fill its missing properties from the others.
+    """
+    rows = sorted(rows, key=lambda row: (-len(profiles[row]), profiles[row]["name"]))
+    keep = profiles[rows[0]]
+    props = {}
+    for row in reversed(rows):
+        props.update(profiles[row])
+    # Same-name copies cannot be told apart by name; schema_bootstrap.py merges those.
+    duplicates = sorted({profiles[row]["name"] for row in rows[1:]} - {keep["name"]})
+    aliases = sorted(set(keep.get("aliases", [])) | set(duplicates))
+    for name in ("name", "corpus_version", "updated_at"):
+        props.pop(name, None)
+    props["aliases"] = aliases
+    return {"keep": keep["name"], "duplicates": duplicates, "props": props}
+
+def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    profiles = db.fetch_alumni_profiles()
+    if len(profiles) < 2:
+        print("Nothing to deduplicate.")
+        db.close()
+        return
+
+    print(f"Embedding {len(profiles)} profiles...")
+    embeddings = get_alumni_embeddings(profiles)
+    groups, num_candidates = find_duplicate_groups(profiles, embeddings)
+    merges = [merge for merge in (plan_merge(profiles, rows) for rows in groups) if merge["duplicates"]]
+    print(f"Scored {num_candidates} candidate pairs ({num_candidates / len(profiles):.1f} per profile); "
+          f"found {len(merges)} duplicate groups.")
+    for merge in merges:
+        print(f"  {merge['keep']} <- {', '.join(merge['duplicates'])}")
+
+    if merges and not dry_run:
+        removed = db.merge_duplicates(merges)
+        print(f"Merged {removed} duplicate nodes.")
+    db.close()
+
+if __name__ == "__main__":
+    main()
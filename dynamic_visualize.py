@@ -43,7 +43,7 @@ def build_profile_description(alumni):
         if value is not None:
             str_val = str(value).strip()
             # DO NOT include name or email in the profile description
-            if key.lower() not in ["name", "email"] and str_val:
+            if key.lower() not in ["name", "email", "aliases", "cluster_id", "corpus_version", "updated_at"] and str_val:
                 parts.append(f"{key}: {str_val}")
     return " ".join(parts)
 
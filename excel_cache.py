@@ -0,0 +1,114 @@
+# Parsing the class list workbooks with pd.read_excel dominates every ingest
+# run, so each workbook is converted once into a typed Parquet file under
+# CACHE_DIR, named after the workbook and the sha256 of its bytes. A changed
+# workbook gets a new hash and is converted again; an unchanged one is read
+# straight from Parquet. The populate scripts read the class lists through
+# load_class_list(), so they all share the cache.
+#
+# Run python excel_cache.py to convert every class list in ./data up front
+# (in parallel, one process per workbook). Needs pyarrow for Parquet.
+import os
+import re
+import sys
+import glob
+import time
+import hashlib
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# ====== Cache Configuration ======
+DATA_GLOB = "./data/*_YC_Class_List.xlsx"
+CACHE_DIR = "./data/cache"
+
+# Excel header (matched case- and whitespace-insensitively) -> node property.
+COLUMN_MAP = {
+    "student": "name",
+    "email": "email",
+    "country (if outside the u.s.)": "country",
+    "u.s. state": "us_state",
+    "city": "city",
+    "graduate/professional school": "grad_school",
+    "employer": "employer",
+    "industry": "industry",
+    "function (role)": "function",
+    "major": "major",
+}
+CLASS_YEAR_PATTERN = re.compile(r"(\d{4})_YC_Class_List")
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_path(path, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{digest[:16]}.parquet")
+
+def class_year(path):
+    match = CLASS_YEAR_PATTERN.search(os.path.basename(path))
+    return int(match.group(1)) if match else 0
+
+def convert_workbook(path, digest=None):
+    """
+    Parse one workbook into the normalized schema (COLUMN_MAP properties as
+    nullable strings plus an int16 class_year) and write it to the cache.
+    Returns the Parquet path.
+    """
+    digest = digest or file_hash(path)
+    df = pd.read_excel(path, dtype=str)
+    df.columns = [" ".join(str(column).split()).lower() for column in df.columns]
+    df = df.rename(columns=COLUMN_MAP)
+    for column in COLUMN_MAP.values():
+        if column not in df.columns:
+            df[column] = pd.NA
+    df = df[list(COLUMN_MAP.values())].astype("string")
+    df["class_year"] = pd.Series(class_year(path), index=df.index, dtype="int16")
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    out_path = cache_path(path, digest)
+    tmp_path = out_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    # Drop conversions of older versions of the same workbook.
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for stale in glob.glob(os.path.join(CACHE_DIR, f"{stem}-*.parquet")):
+        if stale != out_path:
+            os.remove(stale)
+    return out_path
+
+def load_class_list(path):
+    """
+    Return the class list at `path` as a normalized DataFrame, converting the
+    workbook only if its current contents are not cached yet.
+    """
+    digest = file_hash(path)
+    parquet_path = cache_path(path, digest)
+    if not os.path.exists(parquet_path):
+        parquet_path = convert_workbook(path, digest)
+    return pd.read_parquet(parquet_path)
+
+def load_class_lists(paths, max_workers=None):
+    """
+    Load several class lists, converting the uncached workbooks in parallel.
+    """
+    digests = {path: file_hash(path) for path in paths}
+    missing = [path for path in paths if not os.path.exists(cache_path(path, digests[path]))]
+    if len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(convert_workbook, missing, [digests[path] for path in missing]))
+    elif missing:
+        convert_workbook(missing[0], digests[missing[0]])
+    frames = [pd.read_parquet(cache_path(path, digests[path])) for path in paths]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[*COLUMN_MAP.values(), "class_year"])
+
+def main():
+    paths = sorted(sys.argv[1:] or glob.glob(DATA_GLOB))
+    started = time.perf_counter()
+    df = load_class_lists(paths)
+    print(f"Loaded {len(df)} rows from {len(paths)} class lists in {time.perf_counter() - started:.2f}s "
+          f"(cache: '{CACHE_DIR}').")
+
+if __name__ == "__main__":
+    main()
@@ -37,14 +37,14 @@ def fetch_alumnis():
 def build_profile_description(alumni):
     """
     Construct a full profile description by concatenating key-value pairs
-    that are populated. Only include fields (except 'name' and 'email') that
+    that are populated. Only include fields (except 'name', 'email' and internal bookkeeping properties) that
     are not None, not empty, and not the literal 'null' (case-insensitive).
     """
     parts = []
     for key, value in alumni.items():
         if value is not None:
             str_val = str(value).strip()
-            if key.lower() not in ["name", "email"] and str_val and str_val.lower() != "null":
+            if key.lower() not in ["name", "email", "aliases", "cluster_id", "corpus_version", "updated_at"] and str_val and str_val.lower() != "null":
                 parts.append(f"{key}: {str_val}")
     return " ".join(parts)
 
@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+
+from metrics import REGISTRY, Counter, Gauge
+
+# ====== Admission Configuration ======
+MAX_IN_FLIGHT = 8                # requests encoding / searching at the same time
+MAX_QUEUED = 32                  # requests waiting for a slot; more are rejected with 429
+DEFAULT_DEADLINE_SECONDS = 10.0
+MAX_DEADLINE_SECONDS = 30.0
+# Clients can ask for a shorter (or, up to the maximum, longer) deadline.
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+admission_rejections_total = REGISTRY.register(Counter(
+    "alumni_admission_rejections_total", "Requests turned away, by reason (queue_full or deadline).", ["reason"]))
+deadline_cancellations_total = REGISTRY.register(Counter(
+    "alumni_deadline_cancellations_total", "Requests whose deadline passed before a stage, by stage.", ["stage"]))
+requests_in_flight = REGISTRY.register(Gauge(
+    "alumni_requests_in_flight", "Admitted requests currently being served."))
+requests_queued = REGISTRY.register(Gauge(
+    "alumni_requests_queued", "Requests waiting for a serving slot."))
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a request's deadline passes while it is queued or before one of its stages starts.
+    """
+
+class QueueFull(Exception):
+    """
+    Raised when the admission queue is full; retry_after is a hint in seconds.
+    """
+    def __init__(self, retry_after):
+        super().__init__("Server is busy; retry later")
+        self.retry_after = retry_after
+
+class Deadline:
+    def __init__(self, seconds=DEFAULT_DEADLINE_SECONDS):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_header(cls, value):
+        """
+        Deadline from a DEADLINE_HEADER value in milliseconds (default when absent or invalid).
+        """
+        try:
+            seconds = float(value) / 1000 if value else DEFAULT_DEADLINE_SECONDS
+        except ValueError:
+            seconds = DEFAULT_DEADLINE_SECONDS
+        return cls(min(max(seconds, 0.0), MAX_DEADLINE_SECONDS))
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+# The deadline of the request being served by this thread; set by app.py.
+_current = threading.local()
+
+def set_deadline(deadline):
+    _current.deadline = deadline
+
+def current_deadline():
+    return getattr(_current, "deadline", None)
+
+def check_deadline(stage):
+    """
+    Raise DeadlineExceeded if the current request's deadline has passed, so
+    the stage is skipped instead of computed for a client that gave up.
+    A no-op outside requests (warmup, scripts, batch search).
+    """
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired():
+        deadline_cancellations_total.inc(stage=stage)
+        raise DeadlineExceeded(f"Request deadline exceeded before {stage}")
+
+class AdmissionController:
+    """
+    Bounds the requests doing model / index / Neo4j work at once. Up to
+    max_in_flight are served; up to max_queued more wait for a slot until
+    their deadline; anything beyond that is rejected immediately (429), so a
+    burst sheds load instead of piling threads up behind the shared model.
+    """
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, max_queued=MAX_QUEUED):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        # Moving average of how long an admitted request holds its slot.
+        self.mean_service_seconds = 0.1
+        self._slots = threading.Semaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline):
+        """
+        Wait for a slot until the deadline. Returns a token for release();
+        raises QueueFull or DeadlineExceeded.
+        """
+        with self._lock:
+            if self.queued >= self.max_queued:
+                admission_rejections_total.inc(reason="queue_full")
+                raise QueueFull(self.retry_after())
+            self.queued += 1
+            requests_queued.set(self.queued)
+        try:
+            acquired = self._slots.acquire(timeout=deadline.remaining())
+        finally:
+            with self._lock:
+                self.queued -= 1
+                requests_queued.set(self.queued)
+        if not acquired:
+            admission_rejections_total.inc(reason="deadline")
+            raise DeadlineExceeded("Request deadline exceeded while queued")
+        with self._lock:
+            self.in_flight += 1
+            requests_in_flight.set(self.in_flight)
+        return time.monotonic()
+
+    def release(self, token):
+        elapsed = time.monotonic() - token
+        with self._lock:
+            self.in_flight -= 1
+            requests_in_flight.set(self.in_flight)
+            self.mean_service_seconds = 0.8 * self.mean_service_seconds + 0.2 * elapsed
+        self._slots.release()
+
+    def retry_after(self):
+        """
+        Whole seconds until the requests ahead should have drained.
+        """
+        backlog = self.queued + self.in_flight
+        return max(1, math.ceil(self.mean_service_seconds * backlog / self.max_in_flight))
+
+admission = AdmissionController()
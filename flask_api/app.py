@@ -1,27 +1,300 @@
-from flask import Flask, request, jsonify
+import time
+import gzip
+import json
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from serve_profile import launch_query
+from serve_profile import launch_query_hits, check_filters, InvalidFilters, SEARCH_BACKEND
+from lifecycle import lifecycle, start_warmup
+from corpus_reload import reloader
+from pagination import paginated_rows, result_rows, InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from facets import facet_counts, result_facets, RESULT_SET_SIZE, MAX_RESULT_SET_SIZE
+from typeahead import typeahead, DEFAULT_LIMIT, MAX_LIMIT
+from enrichment import profile_details, explain_matches, parse_fields
+from metrics import REGISTRY, request_latency, requests_total, errors_total
+from profiling import should_profile, start_profile, stop_profile, list_profiles, profile_path
+from admission import (admission, Deadline, DeadlineExceeded, QueueFull, DEADLINE_HEADER,
+                       set_deadline, check_deadline)
+
+lifecycle.record("import", time.perf_counter() - _import_started)
+
+# ====== Compression Configuration ======
+GZIP_MIN_BYTES = 1024        # smaller bodies are sent as is
+GZIP_LEVEL = 5
+COMPRESSIBLE_MIMETYPES = ["application/json", "text/plain"]
+
+# Endpoints that encode queries or search, and so go through admission control.
+ADMITTED_ENDPOINTS = ["query_profiles", "stream_query_profiles", "facets"]
 
 app = Flask(__name__)
 CORS(app)
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.profiler = None
+    if request.path.startswith("/api/") and should_profile(request.headers):
+        g.profiler = start_profile()
+
+@app.before_request
+def admit_request():
+    """
+    Give search requests a deadline and a serving slot; answer 429 with
+    Retry-After when the admission queue is full and 504 when the deadline
+    passes while queued.
+    """
+    g.admission_token = None
+    if request.endpoint not in ADMITTED_ENDPOINTS or request.method != "POST":
+        # GET /api/facets is a cached lookup.
+        return None
+    deadline = Deadline.from_header(request.headers.get(DEADLINE_HEADER))
+    try:
+        g.admission_token = admission.acquire(deadline)
+    except QueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 429
+    except DeadlineExceeded as e:
+        return jsonify({"error": str(e)}), 504
+    set_deadline(deadline)
+    return None
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    # Streaming responses are timed (and profiled) until the headers are sent.
+    elapsed = time.perf_counter() - g.request_started
+    if g.get("profiler") is not None:
+        profiler, g.profiler = g.profiler, None
+        profile_name = stop_profile(profiler, endpoint, elapsed)
+        if profile_name is not None:
+            response.headers["X-Profile-Id"] = profile_name
+    request_latency.observe(elapsed, endpoint=endpoint)
+    requests_total.inc(endpoint=endpoint, status=response.status_code)
+    if response.status_code >= 500:
+        errors_total.inc(endpoint=endpoint)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """
+    Gzip JSON and text responses for clients that send Accept-Encoding: gzip.
+    Streamed responses (SSE) and files are left alone.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.is_streamed or response.direct_passthrough:
+        return response
+    response.vary.add("Accept-Encoding")
+    if "gzip" not in request.headers.get("Accept-Encoding", "").lower() or "Content-Encoding" in response.headers:
+        return response
+    body = response.get_data()
+    if len(body) >= GZIP_MIN_BYTES:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+@app.teardown_request
+def release_profiler(exc):
+    # A request that raised before after_request still frees the profiler.
+    if g.get("profiler") is not None:
+        stop_profile(g.profiler, request.path, time.perf_counter() - g.request_started)
+
+@app.teardown_request
+def release_admission(exc):
+    # Streamed responses hold their slot until the stream ends.
+    if g.get("admission_token") is not None:
+        admission.release(g.admission_token)
+        g.admission_token = None
+    set_deadline(None)
+
+@app.route('/debug/profiles', methods=['GET'])
+def profiles():
+    return jsonify({"profiles": list_profiles()}), 200
+
+@app.route('/debug/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    path = profile_path(name)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name)
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # The process is up and serving HTTP; warmup may still be in progress.
+    return jsonify(lifecycle.status()), 200
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    status_code = 200 if lifecycle.is_ready() else 503
+    return jsonify(lifecycle.status()), status_code
+
 @app.route('/api/query', methods=['POST'])
 def query_profiles():
     print("Received a query request.")
     data = request.get_json()
     user_input = data.get("query", "")
-    if not user_input:
+    # A cursor from a previous response continues that search; no query is needed.
+    cursor = data.get("cursor")
+    if not user_input and not cursor:
         return jsonify({"error": "No query provided"}), 400
+    try:
+        page_size = max(1, min(int(data.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({"error": "page_size must be an integer"}), 400
+    filters = data.get("filters")
+    try:
+        check_filters(filters)
+    except InvalidFilters as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
-        print(f"Processing query: {user_input}")
-        matches = launch_query(user_input)
+        print(f"Processing query: {user_input or '(next page)'}")
+        # "fields": ["employer", "city"] (or "*") adds those properties of every
+        # hit to the response, read from the in-memory profile store.
+        fields = parse_fields(data.get("fields")) if "fields" in data else []
+        if user_input and (filters or SEARCH_BACKEND == "neo4j"):
+            # Filtered and Neo4j vector-index searches return a single page.
+            hits, next_cursor = launch_query_hits(user_input, top_n=page_size, filters=filters, fields=fields), None
+        else:
+            state, rows, scores, next_cursor = paginated_rows(user_input, cursor=cursor, page_size=page_size)
+            hits = [{**state.alumni_profiles.project(idx, fields),
+                     "name": state.alumni_profiles.value(idx, "name", "Unknown"), "score": score}
+                    for idx, score in zip(rows, scores)]
         # Ensure that each match is a 2-tuple with similarity as a standard float.
-        matches = [(name, float(sim)) for name, sim in matches]
-        return jsonify({"matches": matches}), 200
+        matches = [(hit["name"], float(hit["score"])) for hit in hits]
+        response = {"matches": matches, "next_cursor": next_cursor}
+        if "fields" in data:
+            response["hits"] = [{**profile_details(hit), "score": float(hit["score"])} for hit in hits]
+        return jsonify(response), 200
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 410
+    except DeadlineExceeded as e:
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         print(f"Error processing query: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/facets', methods=['GET', 'POST'])
+def facets():
+    """
+    Corpus-wide facet counts (city, us_state, industry, function, major,
+    class_year). A POST with a "query" or a "cursor" from /api/query also
+    returns "result_facets" counted over the top "result_size" hits of that search.
+    """
+    payload = facet_counts.get()
+    data = request.get_json(silent=True) or {}
+    user_input = data.get("query", "")
+    cursor = data.get("cursor")
+    if not user_input and not cursor:
+        return jsonify(payload), 200
+    try:
+        result_size = max(1, min(int(data.get("result_size", RESULT_SET_SIZE)), MAX_RESULT_SET_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({"error": "result_size must be an integer"}), 400
+    try:
+        state, rows = result_rows(user_input, cursor=cursor, count=result_size)
+        return jsonify({**payload, "result_size": len(rows),
+                        "result_facets": result_facets(state.alumni_profiles, rows)}), 200
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 410
+    except DeadlineExceeded as e:
+        return jsonify({"error": str(e)}), 504
+    except Exception as e:
+        print(f"Error computing facets: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/typeahead', methods=['GET'])
+def typeahead_completions():
+    """
+    GET /api/typeahead?q=gold&limit=8&fields=employer,city returns the most
+    frequent names, employers, cities and majors with a word starting with q.
+    """
+    prefix = request.args.get("q", "")
+    limit = max(1, min(request.args.get("limit", DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    fields = [field for field in request.args.get("fields", "").split(",") if field] or None
+    index = typeahead.get()
+    return jsonify({"version": index.version, "completions": index.complete(prefix, limit, fields)}), 200
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/query/stream', methods=['POST'])
+def stream_query_profiles():
+    """
+    Streaming variant of /api/query using Server-Sent Events; takes the same
+    body (filtered and Neo4j-backend searches return a single page). The
+    vector search hits are sent first ("hits"), followed by one "profile" event per hit, an
+    optional LLM "explanation" (when the request sets "explain": true) and a
+    final "done" event. Failures after the stream has started arrive as "error".
+    """
+    data = request.get_json()
+    user_input = data.get("query", "")
+    cursor = data.get("cursor")
+    if not user_input and not cursor:
+        return jsonify({"error": "No query provided"}), 400
+    try:
+        page_size = max(1, min(int(data.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({"error": "page_size must be an integer"}), 400
+    filters = data.get("filters")
+    try:
+        check_filters(filters)
+    except InvalidFilters as e:
+        return jsonify({"error": str(e)}), 400
+    explain = bool(data.get("explain", False))
+    # Limits the "profile" events to these properties (plus name).
+    fields = parse_fields(data.get("fields")) if "fields" in data else None
+    # Read with the hits: the event fields, plus the description to explain them.
+    hit_fields = None if fields is None else fields + (["description"] if explain else [])
+
+    def generate():
+        try:
+            if user_input and (filters or SEARCH_BACKEND == "neo4j"):
+                hits, next_cursor = launch_query_hits(user_input, top_n=page_size, filters=filters,
+                                                       fields=hit_fields), None
+            else:
+                state, rows, scores, next_cursor = paginated_rows(user_input, cursor=cursor, page_size=page_size)
+                store = state.alumni_profiles
+                hits = [{**store.project(idx, hit_fields), "name": store.value(idx, "name", "Unknown"), "score": score}
+                        for idx, score in zip(rows, scores)]
+            matches = [(hit["name"], float(hit["score"])) for hit in hits]
+            yield sse_event("hits", {"matches": matches, "next_cursor": next_cursor})
+
+            for hit in hits:
+                profile = {key: value for key, value in hit.items()
+                           if key != "score" and (fields is None or key in fields)}
+                yield sse_event("profile", profile_details({**profile, "name": hit["name"]}))
+
+            if explain and hits and user_input:
+                check_deadline("explain_matches")
+                profiles = [{key: hit[key] for key in ("name", "description") if key in hit} for hit in hits]
+                yield sse_event("explanation", {"explanation": explain_matches(user_input, profiles)})
+            yield sse_event("done", {})
+        except InvalidCursor as e:
+            yield sse_event("error", {"error": str(e), "status": 410})
+        except DeadlineExceeded as e:
+            yield sse_event("error", {"error": str(e), "status": 504})
+        except Exception as e:
+            print(f"Error streaming query: {e}")
+            errors_total.inc(endpoint="/api/query/stream")
+            yield sse_event("error", {"error": str(e), "status": 500})
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
 if __name__ == '__main__':
-    app.run(port=5000)
\ No newline at end of file
+    # Load the model and index in the background; /readyz reports when done.
+    start_warmup()
+    # Then follow writes to the graph and swap in updated indexes.
+    reloader.add_listener(facet_counts.on_reload)
+    reloader.add_listener(typeahead.on_reload)
+    if SEARCH_BACKEND == "neo4j":
+        # Keep the node embeddings behind the Neo4j vector index in step with the graph.
+        from neo4j_vector_backend import sync_state_embeddings
+        reloader.add_listener(lambda state, previous_state: sync_state_embeddings(state))
+    reloader.start()
+    app.run(port=5000)
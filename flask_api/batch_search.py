@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import serve_profile
+from enrichment import profile_details
+
+# ====== Batch Search Configuration ======
+DEFAULT_TOP_N = 10
+CHUNK_SIZE = 1024          # queries read, encoded and searched together
+ENCODE_BATCH_SIZE = 256
+# Queries per index.search call. A memory-mapped snapshot index scores a
+# (block x corpus) float32 matrix at once: 32 x 1M profiles is 128 MB per worker.
+SEARCH_BLOCK_SIZE = 32
+NUM_WORKERS = os.cpu_count() or 1
+
+def read_queries(path):
+    """
+    Yield {"id", "query", "top_n", "filters"} for each non-empty line. A line
+    is either plain query text or a JSON object with at least "query".
+    Raises InvalidFilters for a filter on a property that cannot be filtered.
+    """
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line) if line.startswith("{") else {"query": line}
+            entry.setdefault("id", line_number)
+            try:
+                serve_profile.check_filters(entry.get("filters"))
+            except serve_profile.InvalidFilters as e:
+                raise serve_profile.InvalidFilters(f"Line {line_number}: {e}") from e
+            yield entry
+
+def chunks(entries, size):
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def search_slice(index, query_embeddings, k, block_size=SEARCH_BLOCK_SIZE):
+    """
+    index.search over the queries in blocks of block_size, so the score
+    matrix of one call stays bounded however large the slice is.
+    """
+    results = [index.search(query_embeddings[start:start + block_size], k)
+               for start in range(0, len(query_embeddings), block_size)]
+    return np.concatenate([d for d, _ in results]), np.concatenate([i for _, i in results])
+
+def rank_hits(state, entry, distances, indices, top_n):
+    filters = entry.get("filters")
+    hits = []
+    for idx, score in zip(indices, distances):
+        if not 0 <= idx < len(state.alumni_profiles):
+            continue
+        if filters and not state.alumni_profiles.matches(idx, filters):
+            continue
+        hits.append({"rank": len(hits) + 1, "score": float(score),
+                     **profile_details(state.alumni_profiles[idx])})
+        if len(hits) >= top_n:
+            break
+    return hits
+
+def batch_search(entries, out, top_n=DEFAULT_TOP_N, num_workers=NUM_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Answer every query entry against the serving index and write one JSON
+    line per query to `out`, in input order. The index is loaded (or
+    memory-mapped from the latest snapshot) once; each chunk of queries is
+    encoded in large batches and its search is split across `num_workers`
+    threads, which share the index (FAISS and the NumPy matmul release the GIL).
+    Returns the number of queries answered.
+    """
+    state = serve_profile.get_search_state()
+    if not state.alumni_profiles:
+        raise RuntimeError("No alumni profiles with descriptions found in the database.")
+    if num_workers > 1:
+        # One thread per worker; the pool supplies the parallelism.
+        import faiss
+        faiss.omp_set_num_threads(1)
+
+    answered = 0
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        for chunk in chunks(entries, chunk_size):
+            query_embeddings = serve_profile.encode_queries([entry["query"] for entry in chunk],
+                                                            batch_size=ENCODE_BATCH_SIZE)
+            k = max(entry.get("top_n", top_n) * (serve_profile.FILTER_CANDIDATE_FACTOR if entry.get("filters") else 1)
+                    for entry in chunk)
+            k = min(k, state.index.ntotal)
+            step = -(-len(chunk) // num_workers)
+            slices = [(start, min(start + step, len(chunk))) for start in range(0, len(chunk), step)]
+            results = pool.map(lambda bounds: search_slice(state.index, query_embeddings[bounds[0]:bounds[1]], k),
+                               slices)
+            for (start, _), (distances, indices) in zip(slices, results):
+                for offset, (row_distances, row_indices) in enumerate(zip(distances, indices)):
+                    entry = chunk[start + offset]
+                    hits = rank_hits(state, entry, row_distances, row_indices, entry.get("top_n", top_n))
+                    out.write(json.dumps({"id": entry["id"], "query": entry["query"], "matches": hits}) + "\n")
+            out.flush()
+            answered += len(chunk)
+    return answered
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Search the alumni index for every query in a file and write JSON Lines results.")
+    parser.add_argument("queries", help="file with one query (text or JSON object) per line, or - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="JSON Lines output file (default: stdout)")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        answered = batch_search(read_queries(args.queries), out, args.top_n, args.workers, args.chunk_size)
+    except serve_profile.InvalidFilters as e:
+        parser.error(str(e))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"Answered {answered} queries in {elapsed:.2f}s ({answered / max(elapsed, 1e-9):.1f} queries/s).",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
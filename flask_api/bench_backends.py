@@ -0,0 +1,73 @@
+import sys
+import time
+import numpy as np
+
+import serve_profile
+from neo4j_vector_backend import get_backend
+
+# ====== Benchmark Configuration ======
+TOP_N = 10
+REPEATS = 5
+QUERIES = [
+    "find me other yale graduates from the class of 2020 that work on public policy in washington dc",
+    "investment bankers in new york who work at goldman sachs",
+    "software engineers in san francisco",
+    "consultants who majored in economics",
+    "people working in healthcare in boston",
+    "teachers in connecticut",
+    "graduate students studying law",
+    "product managers at tech companies in seattle",
+]
+
+def percentile_ms(latencies, pct):
+    return np.percentile(latencies, pct) * 1000
+
+def main():
+    """
+    Compare the in-process FAISS path with the Neo4j vector index on the same
+    queries: cold start cost, per-query latency and top-N overlap.
+    Requires neo4j_vector_backend.py to have been run once to store the
+    embeddings and create the vector index.
+    """
+    filters = None
+    if len(sys.argv) > 2:
+        filters = {sys.argv[1]: sys.argv[2]}
+
+    timings = {}
+    started = time.perf_counter()
+    state = serve_profile.get_search_state(timings)
+    faiss_cold = time.perf_counter() - started
+    if not state.alumni_profiles:
+        print("No alumni profiles with descriptions found in the database.")
+        return
+    backend = get_backend()
+
+    faiss_latency, neo4j_latency, overlaps = [], [], []
+    for nl_query in QUERIES:
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            faiss_hits = serve_profile.query_faiss_index(nl_query, state.alumni_profiles, state.index,
+                                                         top_n=TOP_N, filters=filters)
+            faiss_latency.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            neo4j_hits = backend.search(serve_profile.encode_query(nl_query)[0], TOP_N, filters)
+            neo4j_latency.append(time.perf_counter() - started)
+        faiss_names = {name for name, _ in faiss_hits}
+        neo4j_names = {name for name, _ in neo4j_hits}
+        overlaps.append(len(faiss_names & neo4j_names) / max(len(faiss_names), 1))
+
+    print(f"\nCorpus: {len(state.alumni_profiles)} profiles, {len(QUERIES)} queries x {REPEATS} repeats, "
+          f"top {TOP_N}, filters: {filters}")
+    print(f"FAISS cold start (fetch + embed + index): {faiss_cold:.2f}s "
+          + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items()))
+    print("Neo4j vector index cold start: none (embeddings and index live in the database)")
+    print(f"\n{'backend':<8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, latencies in [("faiss", faiss_latency), ("neo4j", neo4j_latency)]:
+        print(f"{name:<8} {percentile_ms(latencies, 50):>8.2f} {percentile_ms(latencies, 95):>8.2f} "
+              f"{max(latencies) * 1000:>8.2f}")
+    print(f"\nMean top-{TOP_N} overlap between backends: {np.mean(overlaps):.0%}")
+    backend.close()
+
+if __name__ == "__main__":
+    main()
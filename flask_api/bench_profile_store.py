@@ -0,0 +1,83 @@
+import gc
+import sys
+import time
+import random
+import tracemalloc
+import numpy as np
+
+from profile_store import ProfileStore
+
+# ====== Benchmark Configuration ======
+SIZES = [100_000, 1_000_000]
+TOP_N = 10
+NUM_LOOKUPS = 1000
+FIELD_VALUES = {
+    "city": 400, "us_state": 55, "country": 60, "industry": 30, "function": 40,
+    "major": 80, "employer": 5000, "grad_school": 300, "class_year": 5,
+}
+
+def synthetic_profiles(num_profiles, seed=0):
+    """
+    Generate profile dicts shaped like the Student nodes: a unique name, email
+    and description plus low-cardinality fields, some of them missing.
+    """
+    rng = random.Random(seed)
+    for i in range(num_profiles):
+        profile = {
+            "name": f"Alumni Number {i}",
+            "email": f"alumni.{i}@aya.yale.edu",
+            "description": f"Alumni Number {i} lives in city {i % 400} and works in industry {i % 30}. "
+                           f"At Yale they majored in major {i % 80}.",
+        }
+        for field, cardinality in FIELD_VALUES.items():
+            if field == "class_year":
+                profile[field] = 2020 + rng.randrange(cardinality)
+            elif field in ("country", "grad_school") and rng.random() < 0.7:
+                continue
+            else:
+                profile[field] = f"{field} {rng.randrange(cardinality)}"
+        yield profile
+
+def traced(build):
+    """
+    Return (result, bytes still allocated by build(), seconds).
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def lookup_ms(profiles, rows, top_n):
+    started = time.perf_counter()
+    for row in rows:
+        [profiles[int(r)] for r in range(row, row + top_n)]
+    return (time.perf_counter() - started) * 1000 / len(rows)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'profiles':>10} {'dicts MB':>9} {'store MB':>9} {'saved':>6} {'B/profile':>10} {'arrays MB':>10} "
+          f"{'build s':>8} {f'top-{TOP_N} dicts ms':>16} {f'top-{TOP_N} store ms':>16} {'filter ms':>10}")
+    for num_profiles in sizes:
+        dicts, dict_bytes, _ = traced(lambda: list(synthetic_profiles(num_profiles)))
+        store, store_bytes, build_seconds = traced(lambda: ProfileStore.from_profiles(dicts))
+        rows = np.random.default_rng(0).integers(0, num_profiles - TOP_N, NUM_LOOKUPS)
+        dict_ms = lookup_ms(dicts, rows, TOP_N)
+        store_ms = lookup_ms(store, rows, TOP_N)
+
+        started = time.perf_counter()
+        store.filter_mask({"city": "city 7", "class_year": 2021})
+        filter_ms = (time.perf_counter() - started) * 1000
+        print(f"{num_profiles:>10} {dict_bytes / 1e6:>9.1f} {store_bytes / 1e6:>9.1f} "
+              f"{1 - store_bytes / dict_bytes:>6.0%} {store_bytes / num_profiles:>10.0f} "
+              f"{store.memory_bytes() / 1e6:>10.1f} {build_seconds:>8.2f} "
+              f"{dict_ms:>16.3f} {store_ms:>16.3f} {filter_ms:>10.2f}")
+        del dicts, store
+    print("\ndicts MB and store MB are what tracemalloc attributes to the list of profile dicts and to the "
+          "ProfileStore built from it; arrays MB is the store's own memory_bytes() estimate.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import faiss
+
+from embedding_store import build_index
+
+# ====== Benchmark Configuration ======
+NUM_PROFILES = 100_000
+DIM = 384            # all-MiniLM-L6-v2 embedding size
+NUM_TOPICS = 200     # synthetic "clusters" of similar profiles
+NUM_QUERIES = 200
+TOP_N = 10
+
+def synthetic_embeddings(num_profiles, dim, num_topics, seed=0):
+    """
+    Generate normalized embeddings grouped around random topic centers, which
+    is closer to real profile embeddings than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_topics, dim)).astype('float32')
+    topics = rng.integers(0, num_topics, num_profiles)
+    embeddings = centers[topics] + 0.6 * rng.standard_normal((num_profiles, dim)).astype('float32')
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings.astype('float32')
+
+def measure(index, queries, top_n):
+    """
+    Run one query at a time (as the API does) and return the result ids and
+    per-query latencies in milliseconds.
+    """
+    results = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        _, indices = index.search(query[None, :], top_n)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(indices[0])
+    return np.array(results), np.array(latencies)
+
+def recall_at_n(results, truth):
+    hits = [len(set(r) & set(t)) for r, t in zip(results, truth)]
+    return sum(hits) / truth.size
+
+def main():
+    num_profiles = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_PROFILES
+    print(f"Generating {num_profiles} synthetic embeddings of dimension {DIM}...")
+    embeddings = synthetic_embeddings(num_profiles, DIM, NUM_TOPICS)
+    rng = np.random.default_rng(1)
+    queries = embeddings[rng.choice(num_profiles, NUM_QUERIES, replace=False)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype('float32')
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype('float32')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings_f32.npy")
+        exact = build_index(embeddings, "float32")
+        truth, exact_latency = measure(exact, queries, TOP_N)
+        float32_bytes = embeddings.nbytes
+
+        print(f"\n{'precision':<10} {'memory MB':>10} {'saved':>7} {f'recall@{TOP_N}':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        print(f"{'float32':<10} {float32_bytes / 1e6:>10.1f} {'0%':>7} {1.0:>10.3f} "
+              f"{np.percentile(exact_latency, 50):>8.2f} {np.percentile(exact_latency, 95):>8.2f}")
+        for precision in ["float16", "int8"]:
+            index = build_index(embeddings, precision, path)
+            results, latency = measure(index, queries, TOP_N)
+            memory = index.memory_bytes()
+            saved = 1 - memory / float32_bytes
+            print(f"{precision:<10} {memory / 1e6:>10.1f} {saved:>7.0%} {recall_at_n(results, truth):>10.3f} "
+                  f"{np.percentile(latency, 50):>8.2f} {np.percentile(latency, 95):>8.2f}")
+
+    print(f"\nQuantized rows are rescored against the memory-mapped float32 matrix "
+          f"(faiss {faiss.__version__}); only touched pages are resident.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import sys
+import time
+import random
+import numpy as np
+
+import serve_profile
+from serve_profile import GraphDB, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+
+# ====== Benchmark Configuration ======
+NUM_QUERIES = 200
+TOP_N = 10
+ENCODE_BATCH_SIZE = 64
+# Each evaluation query asks for two attributes of a random profile; every
+# profile with both values counts as relevant.
+QUERY_FIELDS = [
+    ("function", "city", "{function} in {city}"),
+    ("industry", "city", "people working in {industry} in {city}"),
+    ("major", "industry", "{major} majors who work in {industry}"),
+    ("employer", "city", "alumni at {employer} in {city}"),
+]
+
+def evaluation_queries(profiles, num_queries=NUM_QUERIES, seed=0):
+    """
+    Returns a list of (query text, set of relevant rows).
+    """
+    rng = random.Random(seed)
+    queries = []
+    attempts = 0
+    while len(queries) < num_queries and attempts < num_queries * 20:
+        attempts += 1
+        first, second, template = rng.choice(QUERY_FIELDS)
+        profile = rng.choice(profiles)
+        if not profile.get(first) or not profile.get(second):
+            continue
+        relevant = {row for row, p in enumerate(profiles)
+                    if p.get(first) == profile[first] and p.get(second) == profile[second]}
+        queries.append((template.format(**{first: profile[first], second: profile[second]}), relevant))
+    return queries
+
+def encode(texts):
+    model = serve_profile.get_model()
+    started = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=ENCODE_BATCH_SIZE)
+    elapsed = time.perf_counter() - started
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings.astype('float32'), elapsed
+
+def evaluate(embeddings, query_embeddings, queries):
+    """
+    Mean precision@TOP_N and MRR of the first relevant hit.
+    """
+    scores = query_embeddings @ embeddings.T
+    top = np.argsort(-scores, axis=1)[:, :TOP_N]
+    precision, reciprocal_ranks = [], []
+    for hits, (_, relevant) in zip(top, queries):
+        found = [rank for rank, row in enumerate(hits) if row in relevant]
+        precision.append(len(found) / TOP_N)
+        reciprocal_ranks.append(1 / (found[0] + 1) if found else 0.0)
+    return np.mean(precision), np.mean(reciprocal_ranks)
+
+def main():
+    """
+    Compare the "full" and "budgeted" embedding texts on the profiles in
+    Neo4j: tokens per profile, how many exceed the model's sequence length,
+    encode throughput and retrieval quality on attribute queries.
+    """
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    profiles = db.fetch_alumni_profiles()[:limit]
+    db.close()
+    if not profiles:
+        print("No alumni profiles with descriptions found in the database.")
+        return
+
+    model = serve_profile.get_model()
+    tokenizer = model.tokenizer
+    max_tokens = model.max_seq_length - 2
+    queries = evaluation_queries(profiles)
+    query_embeddings, _ = encode([text for text, _ in queries])
+
+    print(f"{len(profiles)} profiles, {len(queries)} attribute queries, model limit {max_tokens} tokens\n")
+    print(f"{'builder':<10} {'tokens avg':>10} {'tokens p95':>10} {'truncated':>10} {'profiles/s':>11} "
+          f"{f'P@{TOP_N}':>7} {'MRR':>7}")
+    for builder in ["full", "budgeted"]:
+        serve_profile.TEXT_BUILDER = builder
+        texts = [serve_profile.profile_text(profile) for profile in profiles]
+        tokens = np.array([len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]])
+        embeddings, seconds = encode(texts)
+        precision, mrr = evaluate(embeddings, query_embeddings, queries)
+        print(f"{builder:<10} {tokens.mean():>10.1f} {np.percentile(tokens, 95):>10.0f} "
+              f"{(tokens > max_tokens).mean():>10.1%} {len(texts) / seconds:>11.1f} {precision:>7.3f} {mrr:>7.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import multiprocessing
+from collections import deque
+import numpy as np
+from neo4j import GraphDatabase
+
+from embedding_store import (EMBEDDINGS_FILE, MANIFEST_FILE, open_embedding_matrix, save_ids,
+                             embedding_manifest, save_manifest)
+
+# ====== Neo4j Connection Configuration ======
+NEO4J_URI = "bolt://localhost:7687"
+NEO4J_USER = "neo4j"
+NEO4J_PASSWORD = "password"
+
+# ====== Bulk Embedding Configuration ======
+MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384
+NUM_WORKERS = os.cpu_count() or 1
+THREADS_PER_WORKER = 1    # torch intra-op threads per encoder process
+TASK_BATCH_SIZE = 256     # descriptions sent to a worker per task
+ENCODE_BATCH_SIZE = 64    # batch size used by model.encode inside a worker
+TASKS_IN_FLIGHT = 2       # pending tasks per worker; bounds memory while streaming
+
+# Set in each worker process by _init_worker.
+_worker_model = None
+
+class GraphDB:
+    def __init__(self, uri, user, password):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+
+    def close(self):
+        self.driver.close()
+
+    def count_alumni_profiles(self):
+        query = "MATCH (s:Student) WHERE s.description IS NOT NULL RETURN count(s) AS total"
+        with self.driver.session() as session:
+            return session.run(query).single()["total"]
+
+    def fetch_corpus_version(self):
+        query = "OPTIONAL MATCH (m:CorpusMeta {id: 'alumni'}) RETURN coalesce(m.version, 0) AS version"
+        with self.driver.session() as session:
+            return session.run(query).single()["version"]
+
+    def stream_alumni_profiles(self, batch_size):
+        """
+        Stream alumni nodes (with 'name' and 'description') from the database
+        in lists of at most batch_size, without loading the whole result.
+        """
+        query = "MATCH (s:Student) WHERE s.description IS NOT NULL RETURN s {.*, embedding: null} AS s"
+        batch = []
+        with self.driver.session(fetch_size=batch_size) as session:
+            for record in session.run(query):
+                node = {key: value for key, value in record["s"].items() if value is not None}
+                if "name" in node and "description" in node:
+                    batch.append(node)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+def _init_worker(model_name, threads):
+    """
+    Load one CPU encoder per worker process, pinned to `threads` torch threads
+    so that workers do not oversubscribe the cores.
+    """
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+def _encode_batch(start_row, descriptions):
+    started = time.perf_counter()
+    embeddings = _worker_model.encode(descriptions, batch_size=ENCODE_BATCH_SIZE, show_progress_bar=False)
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    elapsed = time.perf_counter() - started
+    return start_row, np.asarray(embeddings, dtype='float32'), os.getpid(), elapsed
+
+def bulk_embed(num_workers=NUM_WORKERS, path=EMBEDDINGS_FILE):
+    """
+    Re-embed every alumni profile across a pool of CPU encoder processes.
+    Descriptions are streamed from Neo4j in batches, encoded out of order by
+    the workers and written in order straight into the on-disk float32 matrix.
+    The matrix is written to a temporary file and swapped in when complete,
+    followed by a manifest of the model, text configuration and corpus
+    version it was encoded under (checked before the matrix is reused).
+    Returns a dict of per-worker {"rows", "seconds"} statistics.
+    """
+    # Imported here so spawned workers do not import the serving module.
+    from serve_profile import profile_text, text_config
+
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    capacity = db.count_alumni_profiles()
+    if capacity == 0:
+        db.close()
+        print("No alumni profiles with descriptions found in the database.")
+        return {}
+
+    # Read before streaming: nodes written meanwhile make the manifest stale, not wrong.
+    manifest = embedding_manifest(MODEL_NAME, text_config(), db.fetch_corpus_version())
+    tmp_path = path + ".tmp.npy"
+    matrix = open_embedding_matrix(tmp_path, capacity, EMBEDDING_DIM)
+    names = []
+    stats = {}
+    rows_written = 0
+
+    def write_result(result):
+        nonlocal rows_written
+        start_row, embeddings, pid, elapsed = result
+        matrix[start_row:start_row + len(embeddings)] = embeddings
+        rows_written = max(rows_written, start_row + len(embeddings))
+        worker = stats.setdefault(pid, {"rows": 0, "seconds": 0.0})
+        worker["rows"] += len(embeddings)
+        worker["seconds"] += elapsed
+
+    print(f"Embedding {capacity} profiles with {num_workers} worker(s)...")
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(num_workers, initializer=_init_worker,
+                      initargs=(MODEL_NAME, THREADS_PER_WORKER)) as pool:
+        pending = deque()
+        for batch in db.stream_alumni_profiles(TASK_BATCH_SIZE):
+            # Nodes added after the count are picked up by the next run.
+            batch = batch[:capacity - len(names)]
+            if not batch:
+                break
+            descriptions = [profile_text(p) for p in batch]
+            pending.append(pool.apply_async(_encode_batch, (len(names), descriptions)))
+            names.extend(p["name"] for p in batch)
+            if len(pending) >= num_workers * TASKS_IN_FLIGHT:
+                write_result(pending.popleft().get())
+        while pending:
+            write_result(pending.popleft().get())
+    db.close()
+    elapsed = time.perf_counter() - started
+
+    matrix.flush()
+    del matrix
+    # The previous manifest must not vouch for the files while they are replaced.
+    if os.path.exists(MANIFEST_FILE):
+        os.remove(MANIFEST_FILE)
+    if rows_written < capacity:
+        # Nodes were removed while streaming; keep only the rows written.
+        trimmed = np.load(tmp_path, mmap_mode='r')[:rows_written]
+        np.save(path, trimmed)
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+    save_ids(names)
+    save_manifest(manifest)
+
+    print(f"\nEmbedded {rows_written} profiles in {elapsed:.1f}s ({rows_written / elapsed:.1f} profiles/s).")
+    print("Throughput per worker:")
+    for pid, worker in sorted(stats.items()):
+        rate = worker["rows"] / worker["seconds"] if worker["seconds"] else 0.0
+        print(f"  worker {pid}: {worker['rows']} profiles in {worker['seconds']:.1f}s busy ({rate:.1f} profiles/s)")
+    return stats
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_WORKERS
+    bulk_embed(num_workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import serve_profile
+from metrics import REGISTRY, Counter
+
+# ====== Reload Configuration ======
+POLL_INTERVAL_SECONDS = 5.0
+# After a reload, write a new snapshot when the last one is older than this,
+# so cold starts only replay recent changes (see snapshot.py).
+SNAPSHOT_INTERVAL_SECONDS = 600.0
+
+reloads_total = REGISTRY.register(Counter(
+    "alumni_corpus_reloads_total", "Serving index reloads, by result (delta, full or error).", ["result"]))
+
+class CorpusReloader:
+    """
+    Polls the corpus version written by the ingest scripts (see
+    corpus_version.py) and, when it moves, builds a new SearchState from only
+    the changed and removed alumni in this background thread before swapping
+    it in. Requests keep using the previous state until the swap.
+    """
+    def __init__(self, poll_interval=POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self.listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.db = None
+        self.last_snapshot = time.monotonic()
+
+    def add_listener(self, callback):
+        """
+        Register callback(state, previous_state) to be called for every reload
+        just before the new state is swapped in, e.g. to update structures
+        derived from the profiles. After a delta reload state.delta_rows says
+        which rows changed (see SearchState).
+        """
+        self.listeners.append(callback)
+
+    def start(self):
+        self.db = serve_profile.GraphDB(serve_profile.NEO4J_URI, serve_profile.NEO4J_USER, serve_profile.NEO4J_PASSWORD)
+        self._thread = threading.Thread(target=self._run, name="corpus-reload", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.db is not None:
+            self.db.close()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                reloads_total.inc(result="error")
+                print(f"Corpus reload failed: {e}")
+
+    def check_once(self):
+        """
+        Apply any pending change. Returns True if a new state was swapped in.
+        """
+        state = serve_profile.get_search_state()
+        version = self.db.fetch_corpus_version()
+        if version == state.version:
+            return False
+
+        started = time.perf_counter()
+        if version < state.version:
+            # The graph was reset (e.g. a fresh database); deltas do not apply.
+            kind = "full"
+            new_state = serve_profile.load_search_state()
+        else:
+            kind = "delta"
+            changed, removed = self.db.fetch_alumni_changes(state.version)
+            new_state = serve_profile.apply_search_delta(state, changed, removed, version)
+        # Listeners prepare their derived structures before the swap, so
+        # requests never see the new state without them.
+        for callback in self.listeners:
+            try:
+                callback(new_state, state)
+            except Exception as e:
+                print(f"Reload listener {getattr(callback, '__qualname__', callback)} failed: {e}")
+        serve_profile.set_search_state(new_state)
+        reloads_total.inc(result=kind)
+        print(f"Reloaded serving index ({kind}) from version {state.version} to {new_state.version} "
+              f"in {time.perf_counter() - started:.2f}s: {len(new_state.alumni_profiles)} profiles.")
+        if serve_profile.USE_SNAPSHOTS and time.monotonic() - self.last_snapshot >= SNAPSHOT_INTERVAL_SECONDS:
+            from snapshot import write_snapshot
+            write_snapshot(new_state)
+            self.last_snapshot = time.monotonic()
+        return True
+
+reloader = CorpusReloader()
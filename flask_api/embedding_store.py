@@ -0,0 +1,201 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+# ====== Embedding Storage Configuration ======
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "store")
+EMBEDDINGS_FILE = os.path.join(STORE_DIR, "embeddings_f32.npy")
+IDS_FILE = os.path.join(STORE_DIR, "embedding_ids.json")
+# Model, text configuration and corpus version the bulk matrix was encoded under.
+MANIFEST_FILE = os.path.join(STORE_DIR, "embeddings_manifest.json")
+
+# Number of compact-index candidates rescored per requested result.
+RESCORE_FACTOR = 4
+
+SUPPORTED_PRECISIONS = ["float32", "float16", "int8"]
+
+def save_full_precision(embeddings, path=EMBEDDINGS_FILE):
+    """
+    Write the full-precision (float32) embedding matrix to disk as a .npy file
+    so it can later be memory-mapped for rescoring.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, np.ascontiguousarray(embeddings, dtype='float32'))
+
+def versioned_embeddings_path(version):
+    """
+    Path of the full-precision matrix for one corpus version of the serving index.
+    """
+    return os.path.join(STORE_DIR, f"embeddings_f32-v{version}.npy")
+
+def remove_embedding_files(keep):
+    """
+    Delete the versioned full-precision matrices other than `keep`.
+    """
+    if not os.path.isdir(STORE_DIR):
+        return
+    for name in os.listdir(STORE_DIR):
+        path = os.path.join(STORE_DIR, name)
+        if name.startswith("embeddings_f32-v") and name.endswith(".npy") and path != keep:
+            os.remove(path)
+
+def load_full_precision(path=EMBEDDINGS_FILE):
+    """
+    Memory-map the full-precision embedding matrix. Pages are only read from
+    disk when rows are accessed.
+    """
+    return np.load(path, mmap_mode='r')
+
+def open_embedding_matrix(path, num_rows, dim):
+    """
+    Create a writable memory-mapped float32 .npy matrix of the given shape,
+    so rows can be written straight to disk as they are computed.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return np.lib.format.open_memmap(path, mode='w+', dtype='float32', shape=(num_rows, dim))
+
+def save_ids(names, path=IDS_FILE):
+    """
+    Write the alumni names in embedding row order (row i of the matrix belongs to names[i]).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(names, f)
+
+def load_ids(path=IDS_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def embedding_manifest(model_name, text_config, corpus_version):
+    """
+    What a bulk embedding matrix was encoded under: the model, a fingerprint
+    of the text configuration (see serve_profile.text_config) and the corpus
+    version read before the profiles were streamed.
+    """
+    text_fingerprint = hashlib.sha256(json.dumps(text_config, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"model": model_name, "text_config": text_fingerprint, "corpus_version": corpus_version}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def load_manifest(path=MANIFEST_FILE):
+    """
+    The stored manifest, or None if there is none (or it cannot be read).
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def build_compact_index(embeddings, precision):
+    """
+    Build a FAISS scalar-quantized inner-product index storing each vector as
+    float16 (2 bytes per dimension) or int8 (1 byte per dimension).
+    """
+    import faiss
+
+    qtypes = {
+        "float16": faiss.ScalarQuantizer.QT_fp16,
+        "int8": faiss.ScalarQuantizer.QT_8bit,
+    }
+    dim = embeddings.shape[1]
+    index = faiss.IndexScalarQuantizer(dim, qtypes[precision], faiss.METRIC_INNER_PRODUCT)
+    index.train(embeddings)
+    index.add(embeddings)
+    return index
+
+class RescoringIndex:
+    """
+    Two-stage search: a first pass over the compact quantized index returns
+    k * rescore_factor candidates, which are then rescored exactly against the
+    memory-mapped float32 vectors. Exposes the same `search(queries, k)` and
+    `ntotal` interface as a FAISS index.
+    """
+    def __init__(self, compact_index, full_precision_path=EMBEDDINGS_FILE, rescore_factor=RESCORE_FACTOR):
+        self.compact_index = compact_index
+        self.full_precision_path = full_precision_path
+        self.rescore_factor = rescore_factor
+        self._full_precision = None
+
+    @property
+    def ntotal(self):
+        return self.compact_index.ntotal
+
+    @property
+    def full_precision(self):
+        # Memory-mapped lazily so that building the index never touches the file.
+        if self._full_precision is None:
+            self._full_precision = load_full_precision(self.full_precision_path)
+        return self._full_precision
+
+    def memory_bytes(self):
+        """
+        Bytes held in memory by the compact vector codes.
+        """
+        return self.compact_index.code_size * self.compact_index.ntotal
+
+    def search(self, queries, k):
+        num_candidates = min(k * self.rescore_factor, self.ntotal)
+        _, candidates = self.compact_index.search(queries, num_candidates)
+
+        distances = np.full((len(queries), k), -np.inf, dtype='float32')
+        indices = np.full((len(queries), k), -1, dtype='int64')
+        for row, (query, cand) in enumerate(zip(queries, candidates)):
+            # Sorted row ids keep the reads on the memory map sequential.
+            cand = np.sort(cand[cand >= 0])
+            exact = self.full_precision[cand] @ query
+            top = np.argsort(-exact)[:k]
+            distances[row, :len(top)] = exact[top]
+            indices[row, :len(top)] = cand[top]
+        return distances, indices
+
+class MemmapFlatIndex:
+    """
+    Exact inner-product search directly over a (memory-mapped) float32 matrix.
+    Same results and O(n * dim) query cost as faiss.IndexFlatIP, but opening it
+    copies nothing, so startup does not grow with the corpus.
+    """
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    @property
+    def ntotal(self):
+        return len(self.embeddings)
+
+    def search(self, queries, k):
+        distances = np.full((len(queries), k), -np.inf, dtype='float32')
+        indices = np.full((len(queries), k), -1, dtype='int64')
+        found = min(k, self.ntotal)
+        if found == 0:
+            return distances, indices
+        scores = queries @ self.embeddings.T
+        top = np.argpartition(-scores, found - 1, axis=1)[:, :found]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        indices[:, :found] = np.take_along_axis(top, order, axis=1)
+        distances[:, :found] = np.take_along_axis(top_scores, order, axis=1)
+        return distances, indices
+
+def build_index(embeddings, precision="float32", path=EMBEDDINGS_FILE):
+    """
+    Build a search index for normalized embeddings at the requested precision.
+    "float32" returns an exact FAISS IndexFlatIP. "float16" and "int8" store
+    the full-precision matrix on disk and return a RescoringIndex over a
+    scalar-quantized compact index.
+    """
+    import faiss
+
+    if precision not in SUPPORTED_PRECISIONS:
+        raise ValueError(f"Unsupported embedding precision '{precision}'; expected one of {SUPPORTED_PRECISIONS}")
+
+    if precision == "float32":
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        index.add(embeddings)
+        return index
+
+    save_full_precision(embeddings, path)
+    return RescoringIndex(build_compact_index(embeddings, precision), path)
@@ -0,0 +1,63 @@
+import os
+import math
+
+from serve_profile import EXCLUDED_FIELDS
+
+# ====== Enrichment Configuration ======
+EXPLANATION_MODEL = "gpt-3.5-turbo"
+EXPLANATION_MAX_TOKENS = 200
+
+# Properties used internally that are never returned to clients: everything
+# kept out of the embedded text except the fields shown to users.
+USER_FACING_FIELDS = ["name", "email"]
+HIDDEN_FIELDS = [field for field in EXCLUDED_FIELDS if field not in USER_FACING_FIELDS]
+
+# Created on first use so the API does not need an OpenAI key unless explanations are requested.
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=os.environ.get("OPENAI_BASE_URL"))
+    return _client
+
+def profile_details(profile):
+    """
+    Return a JSON-safe copy of an alumni profile: hidden fields are dropped and
+    missing spreadsheet values (NaN) become None.
+    """
+    details = {}
+    for key, value in profile.items():
+        if key in HIDDEN_FIELDS:
+            continue
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        details[key] = value
+    return details
+
+def parse_fields(value):
+    """
+    A request's field projection as a list of property names, or None for
+    every field ("*"). Accepts a list or a comma-separated string.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = [str(field).strip() for field in value or [] if str(field).strip()]
+    return None if "*" in fields else fields
+
+def explain_matches(nl_query, profiles):
+    """
+    Ask the LLM to explain in a few sentences why these alumni match the query.
+    """
+    context = "\n".join(f"{p.get('name', 'Unknown')}: {p.get('description', '')}" for p in profiles)
+    response = get_client().chat.completions.create(
+        model=EXPLANATION_MODEL,
+        messages=[
+            {"role": "system", "content": "You explain alumni search results. For each alumni listed, say in one sentence why they match the user's query.\n\nAlumni:\n" + context},
+            {"role": "user", "content": f"User Query: {nl_query}"},
+        ],
+        temperature=0.0,
+        max_tokens=EXPLANATION_MAX_TOKENS,
+    )
+    return response.choices[0].message.content.strip()
@@ -0,0 +1,99 @@
+import threading
+from collections import Counter
+
+import serve_profile
+
+# ====== Facet Configuration ======
+FACET_FIELDS = ["city", "us_state", "industry", "function", "major", "class_year"]
+MAX_FACET_VALUES = 50        # values returned per facet, most frequent first
+RESULT_SET_SIZE = 100        # top results counted for result-set facets
+MAX_RESULT_SET_SIZE = 1000
+
+def _json_value(value):
+    return list(value) if isinstance(value, tuple) else value
+
+def top_values(counts, limit=MAX_FACET_VALUES):
+    """
+    [{"value", "count"}] of the most frequent values, ties broken by value.
+    """
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+    return [{"value": _json_value(value), "count": count} for value, count in ranked]
+
+def count_rows(store, rows=None, fields=FACET_FIELDS):
+    """
+    {field: Counter(value -> count)} over all rows of a ProfileStore, or over
+    the given rows. Category columns are counted with one bincount per field.
+    """
+    if not len(store):
+        # An empty corpus is served from a plain list.
+        return {field: Counter() for field in fields}
+    return {field: Counter(store.value_counts(field, rows)) for field in fields}
+
+class FacetCounts:
+    """
+    Corpus-wide facet counts per SearchState version. Counted once from the
+    columnar store, then kept current on reloads: after a delta reload only
+    the removed/replaced rows of the previous state are subtracted and the
+    added/updated rows of the new one added (see SearchState.delta_rows).
+    The reloader calls on_reload before it swaps the new state in, so the
+    counts of both the serving and the incoming version are kept and reads
+    are a lookup of the pre-rendered payload for the state being served.
+    """
+    def __init__(self, fields=FACET_FIELDS):
+        self.fields = fields
+        self.counts = {}        # version -> {field: Counter}
+        self.payloads = {}      # version -> {"version", "facets"}
+        self._lock = threading.Lock()
+
+    def rebuild(self, state):
+        with self._lock:
+            if state.version not in self.payloads:
+                self._set(state.version, count_rows(state.alumni_profiles, fields=self.fields))
+            return self.payloads[state.version]
+
+    def on_reload(self, state, previous_state):
+        """
+        CorpusReloader listener.
+        """
+        with self._lock:
+            previous_counts = self.counts.get(previous_state.version)
+            if state.delta_rows is None or previous_counts is None:
+                counts = count_rows(state.alumni_profiles, fields=self.fields)
+            else:
+                replaced_rows, updated_rows = state.delta_rows
+                removed = count_rows(previous_state.alumni_profiles, replaced_rows, self.fields)
+                added = count_rows(state.alumni_profiles, updated_rows, self.fields)
+                counts = {}
+                for field in self.fields:
+                    field_counts = previous_counts[field].copy()
+                    field_counts.subtract(removed[field])
+                    field_counts.update(added[field])
+                    counts[field] = +field_counts  # drops values that reached zero
+            self._set(state.version, counts, keep=previous_state.version)
+
+    def _set(self, version, counts, keep=None):
+        for old in [old for old in self.counts if old not in (version, keep)]:
+            del self.counts[old]
+            del self.payloads[old]
+        self.counts[version] = counts
+        self.payloads[version] = {"version": version,
+                                  "facets": {field: top_values(counts[field]) for field in self.fields}}
+
+    def get(self):
+        """
+        The {"version", "facets"} payload for the serving state.
+        """
+        state = serve_profile.get_search_state()
+        payload = self.payloads.get(state.version)
+        if payload is None:
+            # First call, or a swap that did not go through the reloader.
+            payload = self.rebuild(state)
+        return payload
+
+facet_counts = FacetCounts()
+
+def result_facets(store, rows, fields=FACET_FIELDS, limit=MAX_FACET_VALUES):
+    """
+    Facet counts within one result set (row ids into `store`).
+    """
+    return {field: top_values(counts, limit) for field, counts in count_rows(store, rows, fields).items()}
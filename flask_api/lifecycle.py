@@ -0,0 +1,98 @@
+import threading
+import time
+
+import serve_profile
+from typeahead import typeahead
+from facets import facet_counts
+
+# ====== Lifecycle Stages ======
+STAGE_STARTING = "starting"  # process imported, warmup not started yet
+STAGE_WARMING = "warming"    # model and index are being loaded in the background
+STAGE_READY = "ready"        # a dummy query has succeeded; requests are served at full speed
+STAGE_FAILED = "failed"      # warmup raised; requests will retry the lazy load
+
+WARMUP_QUERY = "find me yale graduates working in new york"
+
+class Lifecycle:
+    """
+    Tracks the startup stage of the API process and how long each startup step took.
+    """
+    def __init__(self):
+        self.stage = STAGE_STARTING
+        self.error = None
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds):
+        with self._lock:
+            self.timings[step] = seconds
+
+    def set_stage(self, stage, error=None):
+        with self._lock:
+            self.stage = stage
+            self.error = error
+
+    def is_ready(self):
+        return self.stage == STAGE_READY
+
+    def status(self):
+        with self._lock:
+            status = {
+                "stage": self.stage,
+                "timings": {step: round(seconds, 4) for step, seconds in self.timings.items()},
+            }
+            if self.error:
+                status["error"] = self.error
+            return status
+
+lifecycle = Lifecycle()
+
+def warmup():
+    """
+    Load the model, build the search state and run a dummy query, recording
+    the time spent in each step. Logs the full startup breakdown when done.
+    """
+    lifecycle.set_stage(STAGE_WARMING)
+    try:
+        started = time.perf_counter()
+        serve_profile.get_model()
+        lifecycle.record("load_model", time.perf_counter() - started)
+
+        timings = {}
+        state = serve_profile.get_search_state(timings)
+        for step, seconds in timings.items():
+            lifecycle.record(step, seconds)
+
+        started = time.perf_counter()
+        if state.alumni_profiles:
+            serve_profile.query_faiss_index(WARMUP_QUERY, state.alumni_profiles, state.index)
+        else:
+            serve_profile.encode_query(WARMUP_QUERY)
+        lifecycle.record("dummy_query", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        typeahead.get()
+        lifecycle.record("typeahead_index", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        facet_counts.get()
+        lifecycle.record("facet_counts", time.perf_counter() - started)
+    except Exception as e:
+        lifecycle.set_stage(STAGE_FAILED, error=str(e))
+        print(f"Warmup failed: {e}")
+        return
+
+    lifecycle.set_stage(STAGE_READY)
+    timings = lifecycle.status()["timings"]
+    print("Startup time breakdown:")
+    for step, seconds in timings.items():
+        print(f"  {step}: {seconds:.3f}s")
+    print(f"  total: {sum(timings.values()):.3f}s")
+
+def start_warmup():
+    """
+    Run warmup() in a background thread so the server can accept health checks immediately.
+    """
+    thread = threading.Thread(target=warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,265 @@
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+import serve_profile
+from metrics import stage_latency, stage_errors_total
+
+# ====== Load Test Configuration ======
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS = 500
+STUB_PROFILES = 10000
+STUB_EMBEDDING_DIM = 384
+PROMPT_SEED = 7
+
+# The README sample prompt plus variations of it.
+SAMPLE_PROMPT = "find me other yale graduates from the class of 2020 that work on public policy in washington dc"
+PROMPT_TEMPLATES = [
+    "find me other yale graduates from the class of {year} that work on {field} in {city}",
+    "yale alumni in {city} working in {field}",
+    "who from the class of {year} majored in {major}",
+    "{major} majors working as {function} in {city}",
+    "alumni who work at {employer}",
+    "people in {field} who went to graduate school",
+]
+STUB_VALUES = {
+    "year": ["2020", "2021", "2022", "2023", "2024"],
+    "city": ["New York", "Washington", "San Francisco", "Boston", "New Haven", "Chicago", "Seattle", "Los Angeles"],
+    "us_state": ["New York", "District of Columbia", "California", "Massachusetts", "Connecticut", "Illinois",
+                 "Washington"],
+    "field": ["public policy", "finance", "consulting", "software engineering", "healthcare", "education", "law"],
+    "industry": ["Government/Public Policy", "Finance/Insurance/Real Estate", "Consulting", "Technology",
+                 "Healthcare/Pharmaceutical/Biotech/Global Health", "Education", "Law"],
+    "function": ["analyst", "consultant", "engineer", "researcher", "teacher", "product manager", "associate"],
+    "major": ["Economics", "Political Science", "Computer Science", "History", "Neuroscience", "Global Affairs"],
+    "employer": ["Goldman Sachs", "McKinsey & Company", "Google", "Teach For America", "Yale University",
+                 "Brookings Institution", "Epic Systems Corporation"],
+}
+
+def build_prompts(count=200, seed=PROMPT_SEED):
+    rng = random.Random(seed)
+    prompts = [SAMPLE_PROMPT]
+    while len(prompts) < count:
+        template = rng.choice(PROMPT_TEMPLATES)
+        prompts.append(template.format(**{key: rng.choice(values) for key, values in STUB_VALUES.items()}))
+    return prompts
+
+class StubEncoder:
+    """
+    Stand-in for the SentenceTransformer: hashes each word into a fixed-size
+    vector, so texts sharing words get similar embeddings. `latency` seconds
+    per call emulate the model's cost.
+    """
+    def __init__(self, dim=STUB_EMBEDDING_DIM, latency=0.0):
+        self.dim = dim
+        self.latency = latency
+
+    def encode(self, texts, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        embeddings = np.zeros((len(texts), self.dim), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+                embeddings[row, int.from_bytes(digest[:4], "little") % self.dim] += 1.0 if digest[4] & 1 else -1.0
+            embeddings[row, 0] += 1e-3  # never all zeros
+        return embeddings
+
+class StubGraphDB:
+    """
+    Stand-in for serve_profile.GraphDB serving a fixed synthetic corpus.
+    """
+    num_profiles = STUB_PROFILES
+
+    def __init__(self, uri=None, user=None, password=None):
+        rng = random.Random(PROMPT_SEED)
+        self.profiles = []
+        for i in range(self.num_profiles):
+            profile = {key: rng.choice(STUB_VALUES[key])
+                       for key in ["city", "us_state", "industry", "function", "major", "employer"]}
+            profile["name"] = f"Stub Alumni {i}"
+            profile["class_year"] = int(rng.choice(STUB_VALUES["year"]))
+            profile["description"] = (f"{profile['name']} works at {profile['employer']} in {profile['city']} "
+                                      f"as a {profile['function']} in {profile['industry']}.")
+            self.profiles.append(profile)
+
+    def close(self):
+        pass
+
+    def fetch_alumni_profiles(self):
+        return list(self.profiles)
+
+    def fetch_corpus_version(self):
+        return 1
+
+    def fetch_alumni_changes(self, since_version):
+        return [], []
+
+def install_stubs(num_profiles=STUB_PROFILES, encode_latency=0.0):
+    """
+    Point serve_profile at the stub encoder and database, so the load test
+    needs neither the model download nor a running Neo4j. Snapshots are
+    disabled so the run does not touch flask_api/store.
+    """
+    StubGraphDB.num_profiles = num_profiles
+    serve_profile.model = StubEncoder(latency=encode_latency)
+    serve_profile.GraphDB = StubGraphDB
+    serve_profile.USE_SNAPSHOTS = False
+    # The stub has no tokenizer for the budgeted text builder.
+    serve_profile.TEXT_BUILDER = "full"
+    serve_profile.SEARCH_BACKEND = "faiss"
+
+def start_local_server():
+    """
+    Warm up and serve app.py on a free local port in a background thread.
+    Returns (base URL, server).
+    """
+    from werkzeug.serving import make_server
+    from app import app
+    from lifecycle import warmup
+
+    warmup()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+def send_query(base_url, prompt, page_size):
+    body = json.dumps({"query": prompt, "page_size": page_size}).encode("utf-8")
+    request = urllib.request.Request(f"{base_url}/api/query", data=body,
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return 0
+
+def run_load(base_url, prompts, num_requests, concurrency, rate=None, page_size=5):
+    """
+    Send num_requests queries with at most `concurrency` in flight. With a
+    `rate` (requests per second) arrivals are open-loop Poisson and latency
+    is measured from the scheduled arrival, so time spent waiting for a free
+    worker counts; without it every worker sends back to back.
+    Returns (list of (latency seconds, status), wall time).
+    """
+    rng = random.Random(PROMPT_SEED)
+    results = []
+    results_lock = threading.Lock()
+
+    def one(prompt, scheduled):
+        status = send_query(base_url, prompt, page_size)
+        with results_lock:
+            results.append((time.perf_counter() - scheduled, status))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        arrival = started
+        for i in range(num_requests):
+            if rate:
+                arrival += rng.expovariate(rate)
+                delay = arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                arrival = time.perf_counter()
+            pool.submit(one, prompts[i % len(prompts)], arrival)
+            if not rate:
+                # Closed loop: keep exactly `concurrency` requests in flight.
+                while i + 1 - len(results) >= concurrency:
+                    time.sleep(0.0005)
+    return results, time.perf_counter() - started
+
+def histogram_percentile(counts, buckets, pct):
+    """
+    Upper bucket bound below which pct% of the observations fall.
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    cumulative = 0
+    for bound, count in zip(buckets, counts):
+        cumulative += count
+        if cumulative >= total * pct / 100:
+            return bound
+    return float("inf")
+
+def stage_report(before):
+    """
+    Per-stage counts, error rates and latency percentiles since the `before`
+    snapshots (stage -> histogram snapshot).
+    """
+    rows = []
+    for (stage,) in stage_latency.label_values():
+        after = stage_latency.snapshot(stage=stage)
+        start = before.get(stage, {"counts": [0] * len(stage_latency.buckets), "count": 0})
+        counts = [a - b for a, b in zip(after["counts"], start["counts"])]
+        calls = after["count"] - start["count"]
+        if not calls:
+            continue
+        errors = stage_errors_total.value(stage=stage) - before.get(f"{stage}:errors", 0)
+        rows.append((stage, calls, errors / calls,
+                     *(histogram_percentile(counts, stage_latency.buckets, pct) for pct in (50, 95, 99))))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test POST /api/query.")
+    parser.add_argument("--url", help="base URL of a running API (default: serve app.py in-process)")
+    parser.add_argument("--stub", action="store_true", help="in-process only: stub encoder and Neo4j")
+    parser.add_argument("--profiles", type=int, default=STUB_PROFILES, help="stub corpus size")
+    parser.add_argument("--encode-ms", type=float, default=0.0, help="simulated stub encode latency")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, help="open-loop arrival rate in requests/s")
+    parser.add_argument("--page-size", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.url:
+        base_url, server = args.url.rstrip("/"), None
+    else:
+        if args.stub:
+            install_stubs(args.profiles, args.encode_ms / 1000)
+        base_url, server = start_local_server()
+
+    before = {}
+    for (stage,) in stage_latency.label_values():
+        before[stage] = stage_latency.snapshot(stage=stage)
+        before[f"{stage}:errors"] = stage_errors_total.value(stage=stage)
+
+    prompts = build_prompts()
+    results, wall = run_load(base_url, prompts, args.requests, args.concurrency, args.rate, args.page_size)
+    if server is not None:
+        server.shutdown()
+
+    latencies = np.array([latency for latency, _ in results])
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    errors = sum(count for status, count in statuses.items() if status != 200)
+    mode = f"open loop at {args.rate:g} req/s" if args.rate else "closed loop"
+    print(f"\n{len(results)} requests, concurrency {args.concurrency}, {mode}, against {base_url}"
+          + (f" (stub corpus of {args.profiles} profiles)" if args.stub and not args.url else ""))
+    print(f"Throughput: {len(results) / wall:.1f} req/s over {wall:.2f}s")
+    print(f"Latency: p50 {np.percentile(latencies, 50) * 1000:.1f} ms, p95 {np.percentile(latencies, 95) * 1000:.1f} ms, "
+          f"p99 {np.percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"Errors: {errors / len(results):.2%} "
+          + ", ".join(f"{status or 'connection failed'}: {count}" for status, count in sorted(statuses.items())))
+
+    if server is None:
+        print("\n(per-stage metrics are only collected in-process; scrape /metrics on the target for them)")
+        return
+    print(f"\n{'stage':<24} {'calls':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for stage, calls, error_rate, p50, p95, p99 in stage_report(before):
+        print(f"{stage:<24} {calls:>7} {error_rate:>7.2%} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {p99 * 1000:>8.1f}")
+    print("(stage percentiles are histogram bucket upper bounds)")
+
+if __name__ == "__main__":
+    main()
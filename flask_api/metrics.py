@@ -0,0 +1,181 @@
+import time
+import threading
+import functools
+
+# ====== Metrics Configuration ======
+# Latency histogram bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = [
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    ]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+class Metric:
+    """
+    Base class for a metric family with optional labels. Each distinct
+    combination of label values gets its own series.
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, value in series:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def label_values(self):
+        """
+        Return the label value tuples of every series recorded so far.
+        """
+        with self._lock:
+            return sorted(self._series)
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self, **labels):
+        """
+        Return a copy of one series ({"counts", "sum", "count"}), e.g. to diff before and after a run.
+        """
+        series = self._series.get(self._key(labels))
+        if series is None:
+            return {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        with self._lock:
+            return {"counts": list(series["counts"]), "sum": series["sum"], "count": series["count"]}
+
+    def _render_series(self, key, series):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, series["counts"]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', bound))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {series['count']}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series['sum']}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Render every registered metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+stage_latency = REGISTRY.register(Histogram(
+    "alumni_stage_duration_seconds",
+    "Time spent in each stage of the serving path (launch_query and query_faiss_index cover every "
+    "first-page search, paginated or filtered; index_search is the index lookup alone).", ["stage"]))
+request_latency = REGISTRY.register(Histogram(
+    "alumni_request_duration_seconds", "End-to-end HTTP request latency.", ["endpoint"]))
+requests_total = REGISTRY.register(Counter(
+    "alumni_requests_total", "HTTP requests handled, by endpoint and status code.", ["endpoint", "status"]))
+errors_total = REGISTRY.register(Counter(
+    "alumni_errors_total", "Requests that failed with a server error.", ["endpoint"]))
+stage_errors_total = REGISTRY.register(Counter(
+    "alumni_stage_errors_total", "Calls to a serving stage that raised.", ["stage"]))
+cache_lookups_total = REGISTRY.register(Counter(
+    "alumni_cache_lookups_total", "Cache lookups, by cache and result (hit or miss).", ["cache", "result"]))
+cache_hit_ratio = REGISTRY.register(Gauge(
+    "alumni_cache_hit_ratio", "Fraction of lookups served from the cache since startup.", ["cache"]))
+index_size = REGISTRY.register(Gauge(
+    "alumni_index_size", "Number of vectors in the serving index."))
+index_version = REGISTRY.register(Gauge(
+    "alumni_index_version", "Version of the serving index currently in use."))
+
+def record_cache_lookup(cache, hit):
+    cache_lookups_total.inc(cache=cache, result="hit" if hit else "miss")
+    hits = cache_lookups_total.value(cache=cache, result="hit")
+    misses = cache_lookups_total.value(cache=cache, result="miss")
+    cache_hit_ratio.set(hits / (hits + misses), cache=cache)
+
+def timed(stage):
+    """
+    Decorator recording the wall-clock time of every call (successful or not)
+    in the stage latency histogram, and failed calls in the stage error counter.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                stage_errors_total.inc(stage=stage)
+                raise
+            finally:
+                stage_latency.observe(time.perf_counter() - started, stage=stage)
+        return wrapper
+    return decorator
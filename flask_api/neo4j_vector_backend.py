@@ -0,0 +1,185 @@
+import os
+import re
+import sys
+import numpy as np
+from neo4j import GraphDatabase
+
+from serve_profile import (NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, MODEL_NAME, GraphDB, encode_query,
+                           get_alumni_embeddings, check_filters, text_config)
+from embedding_store import (EMBEDDINGS_FILE, IDS_FILE, load_full_precision, load_ids, embedding_manifest,
+                             load_manifest)
+from metrics import timed
+from admission import check_deadline
+
+# ====== Neo4j Vector Index Configuration ======
+VECTOR_INDEX_NAME = "student_embedding"
+EMBEDDING_PROPERTY = "embedding"
+EMBEDDING_DIM = 384
+WRITE_BATCH_SIZE = 500
+# With filters, the vector index is asked for top_n * CANDIDATE_FACTOR nodes
+# so that enough remain after the property filters are applied.
+CANDIDATE_FACTOR = 10
+
+class Neo4jVectorBackend:
+    """
+    Search backend that stores the embeddings on the Student nodes and answers
+    queries with the Neo4j vector index, so a query (plus Cypher property
+    filters) is one database round trip and no profiles are pulled into Python.
+    """
+    def __init__(self, uri, user, password):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+
+    def close(self):
+        self.driver.close()
+
+    def create_vector_index(self, dim=EMBEDDING_DIM):
+        query = (
+            f"CREATE VECTOR INDEX {VECTOR_INDEX_NAME} IF NOT EXISTS "
+            f"FOR (s:Student) ON (s.{EMBEDDING_PROPERTY}) "
+            "OPTIONS {indexConfig: {`vector.dimensions`: $dim, `vector.similarity_function`: 'cosine'}}"
+        )
+        with self.driver.session() as session:
+            session.run(query, dim=dim).consume()
+            session.run("CALL db.awaitIndexes()").consume()
+
+    def write_embeddings(self, names, embeddings):
+        """
+        Store each embedding on the node with the matching name, WRITE_BATCH_SIZE
+        nodes per transaction. Returns the number of nodes updated.
+        """
+        updated = 0
+        with self.driver.session() as session:
+            for start in range(0, len(names), WRITE_BATCH_SIZE):
+                rows = [
+                    {"name": name, "embedding": embedding.tolist()}
+                    for name, embedding in zip(names[start:start + WRITE_BATCH_SIZE],
+                                               embeddings[start:start + WRITE_BATCH_SIZE])
+                ]
+                updated += session.execute_write(self._write_embeddings_tx, rows)
+        return updated
+
+    @staticmethod
+    def _write_embeddings_tx(tx, rows):
+        query = (
+            "UNWIND $rows AS row "
+            "MATCH (s:Student {name: row.name}) "
+            f"CALL db.create.setNodeVectorProperty(s, '{EMBEDDING_PROPERTY}', row.embedding) "
+            "RETURN count(s) AS updated"
+        )
+        record = tx.run(query, rows=rows).single()
+        return record["updated"] if record else 0
+
+    @timed("neo4j_vector_query")
+    def search(self, query_embedding, top_n=5, filters=None, fields=None):
+        """
+        Query the vector index and apply exact-match property filters in the
+        same Cypher statement. Returns a list of (name, cosine similarity)
+        tuples, or with `fields` (property names, or ["*"] for all) a list of
+        {"name", "score", *fields} read by the same statement.
+        """
+        # Unknown properties are rejected (InvalidFilters), as on the FAISS path.
+        check_filters(filters)
+        filters = filters or {}
+        conditions = [f"node.{key} = $filter_{key}" for key in filters]
+        params = {f"filter_{key}": value for key, value in filters.items()}
+        k = top_n * CANDIDATE_FACTOR if filters else top_n
+
+        query = (
+            "CALL db.index.vector.queryNodes($index_name, $k, $embedding) YIELD node, score "
+            + (f"WHERE {' AND '.join(conditions)} " if conditions else "")
+            + "RETURN node.name AS name, score"
+            + (f", {projection(fields)} AS props" if fields is not None else "")
+            + " ORDER BY score DESC LIMIT $top_n"
+        )
+        check_deadline("neo4j_vector_query")
+        with self.driver.session() as session:
+            result = session.run(query, index_name=VECTOR_INDEX_NAME, k=k, top_n=top_n,
+                                 embedding=query_embedding.tolist(), **params)
+            # Neo4j reports cosine scores as (1 + cos) / 2; convert back so they
+            # are comparable to the FAISS inner-product scores.
+            if fields is None:
+                return [(record["name"], 2 * record["score"] - 1) for record in result]
+            return [{**{key: value for key, value in record["props"].items() if value is not None},
+                     "name": record["name"], "score": 2 * record["score"] - 1} for record in result]
+
+def projection(fields):
+    """
+    Cypher map projection of the requested node properties; the embedding is never returned.
+    """
+    if "*" in fields:
+        return f"node {{.*, {EMBEDDING_PROPERTY}: null}}"
+    names = [field for field in fields if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", field) and field != EMBEDDING_PROPERTY]
+    return "node {" + ", ".join(f".{field}" for field in names) + "}"
+
+# Opened on first use.
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = Neo4jVectorBackend(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    return _backend
+
+def launch_vector_index_query(nl_query, top_n=5, filters=None, fields=None):
+    query_embedding = encode_query(nl_query)[0]
+    return get_backend().search(query_embedding, top_n, filters, fields)
+
+def sync_state_embeddings(state):
+    """
+    CorpusReloader helper: write the embeddings of the rows a delta reload
+    added or updated (every row after a full reload) onto their nodes, so the
+    vector index follows add_alumni.py, dedupe_alumni.py and the other writers.
+    Removed nodes leave the vector index with the node. Returns the number of nodes updated.
+    """
+    if not state.alumni_profiles:
+        return 0
+    rows = state.delta_rows[1] if state.delta_rows is not None else range(len(state.alumni_profiles))
+    rows = list(rows)
+    if not rows:
+        return 0
+    names = [state.alumni_profiles.value(row, "name") for row in rows]
+    return get_backend().write_embeddings(names, np.asarray(state.embeddings[rows], dtype='float32'))
+
+def sync_embeddings():
+    """
+    Write every alumni embedding onto its node and create the vector index.
+    Uses the matrix written by bulk_embed.py when its manifest matches the
+    current model, text configuration and corpus version, otherwise embeds
+    the profiles in this process.
+    """
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    expected = embedding_manifest(MODEL_NAME, text_config(), db.fetch_corpus_version())
+    if os.path.exists(EMBEDDINGS_FILE) and os.path.exists(IDS_FILE) and load_manifest() == expected:
+        db.close()
+        names = load_ids()
+        embeddings = load_full_precision()
+        print(f"Using {len(names)} embeddings from '{EMBEDDINGS_FILE}'.")
+    else:
+        if os.path.exists(EMBEDDINGS_FILE):
+            print(f"'{EMBEDDINGS_FILE}' was encoded under a different model, text configuration or "
+                  "corpus version; re-embedding.")
+        profiles = db.fetch_alumni_profiles()
+        db.close()
+        if not profiles:
+            print("No alumni profiles with descriptions found in the database.")
+            return 0
+        names = [profile["name"] for profile in profiles]
+        print(f"Embedding {len(names)} profiles...")
+        embeddings = get_alumni_embeddings(profiles)
+
+    backend = get_backend()
+    backend.create_vector_index(int(np.shape(embeddings)[1]))
+    updated = backend.write_embeddings(names, embeddings)
+    print(f"Stored embeddings on {updated} nodes and ensured vector index '{VECTOR_INDEX_NAME}'.")
+    return updated
+
+def main():
+    if len(sys.argv) > 1:
+        for name, score in launch_vector_index_query(" ".join(sys.argv[1:])):
+            print(f"{name} (Similarity: {score:.3f})")
+        return
+    sync_embeddings()
+    get_backend().close()
+
+if __name__ == "__main__":
+    main()
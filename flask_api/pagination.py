@@ -0,0 +1,214 @@
+import base64
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from serve_profile import encode_query, get_search_state
+from metrics import timed, stage_latency, record_cache_lookup
+from admission import check_deadline
+
+# ====== Pagination Configuration ======
+DEFAULT_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 100
+INITIAL_PAGES = 4            # the first search ranks this many pages up front
+CURSOR_TTL_SECONDS = 300     # how long a ranked list stays available to its cursor
+MAX_CACHED_SEARCHES = 1000   # least recently used ranked lists are evicted beyond this
+
+class InvalidCursor(Exception):
+    """
+    Raised when a cursor cannot be decoded or its ranked list has expired.
+    """
+
+class RankedSearch:
+    """
+    The ranked result list for one query, kept server-side between pages.
+    Holds the query embedding and the SearchState it was ranked against, so
+    later pages never re-encode the query and row ids stay consistent.
+    """
+    def __init__(self, query_embedding, state):
+        self.query_embedding = query_embedding
+        self.state = state
+        self.ids = []
+        self.scores = []
+        self.exhausted = False
+        self.expires_at = time.monotonic() + CURSOR_TTL_SECONDS
+        self._lock = threading.Lock()
+
+    def ensure(self, count):
+        """
+        Make sure at least `count` results are ranked, doubling k until it is
+        reached or the whole corpus has been ranked. Deep pages therefore cost
+        O(log(depth)) searches instead of a full corpus ranking up front.
+        """
+        with self._lock:
+            if count <= len(self.ids) or self.exhausted:
+                return
+            total = self.state.index.ntotal
+            k = max(len(self.ids), 1)
+            while k < count:
+                k *= 2
+            k = min(k, total)
+            check_deadline("index_search")
+            started = time.perf_counter()
+            distances, indices = self.state.index.search(self.query_embedding, k)
+            stage_latency.observe(time.perf_counter() - started, stage="index_search")
+            valid = indices[0] >= 0
+            self.ids = indices[0][valid].tolist()
+            self.scores = distances[0][valid].tolist()
+            self.exhausted = k >= total
+
+    def page(self, offset, page_size):
+        """
+        Returns the (row ids, scores) of one page and whether more results follow.
+        """
+        self.ensure(offset + page_size)
+        rows = self.ids[offset:offset + page_size]
+        scores = self.scores[offset:offset + page_size]
+        has_more = offset + page_size < len(self.ids) or not self.exhausted
+        return rows, scores, has_more
+
+class SearchCache:
+    """
+    Short-lived, size-bounded cache of RankedSearch objects keyed by a random token.
+    Each entry pins the SearchState it was ranked against, so inserts drop
+    expired entries and those ranked against anything older than the previous
+    corpus version: at most two states stay reachable after a hot reload, and
+    cursors of the version just replaced keep working.
+    """
+    def __init__(self, max_entries=MAX_CACHED_SEARCHES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = []     # the current and previous state versions seen
+
+    def put(self, search):
+        token = secrets.token_urlsafe(12)
+        with self._lock:
+            version = search.state.version
+            if version not in self._versions:
+                self._versions = [version] + self._versions[:1]
+                self._evict(lambda entry: entry.state.version not in self._versions)
+            self._evict(lambda entry: entry.expires_at < time.monotonic())
+            self._entries[token] = search
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def _evict(self, predicate):
+        for token in [token for token, entry in self._entries.items() if predicate(entry)]:
+            del self._entries[token]
+
+    def get(self, token):
+        with self._lock:
+            search = self._entries.get(token)
+            if search is None:
+                return None
+            if search.expires_at < time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return search
+
+    def __len__(self):
+        return len(self._entries)
+
+search_cache = SearchCache()
+
+def encode_cursor(token, offset):
+    raw = json.dumps({"t": token, "o": offset}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor):
+    if not isinstance(cursor, str):
+        raise InvalidCursor("Malformed cursor")
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        token, offset = payload["t"], int(payload["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(token, str) or offset < 0:
+        raise InvalidCursor("Malformed cursor")
+    return token, offset
+
+def cached_search(cursor):
+    """
+    Returns (RankedSearch, token, offset) for a cursor; raises InvalidCursor.
+    """
+    token, offset = decode_cursor(cursor)
+    search = search_cache.get(token)
+    record_cache_lookup("cursor", search is not None)
+    if search is None:
+        raise InvalidCursor("Cursor has expired; run the query again")
+    return search, token, offset
+
+@timed("query_faiss_index")
+def rank_query(nl_query, state, count):
+    """
+    Encode the query and rank its top `count` results against state; the
+    unfiltered counterpart of serve_profile.query_faiss_rows.
+    """
+    search = RankedSearch(encode_query(nl_query), state)
+    search.ensure(count)
+    return search
+
+@timed("launch_query")
+def launch_ranked_search(nl_query, state, page_size):
+    """
+    First page of a query: rank INITIAL_PAGES pages and cache the ranked list
+    for its cursor. Returns (RankedSearch, token).
+    """
+    search = rank_query(nl_query, state, page_size * INITIAL_PAGES)
+    return search, search_cache.put(search)
+
+@timed("paginated_query")
+def paginated_rows(nl_query=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of results as (state, row ids, scores, next cursor), where
+    row ids index state.alumni_profiles and the cursor is None on the last page.
+    The first call (no cursor) encodes the query and ranks INITIAL_PAGES pages
+    (recorded as the launch_query and query_faiss_index stages, like a filtered
+    search); calls with a cursor are served from the cached ranked list.
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    if cursor:
+        search, token, offset = cached_search(cursor)
+    else:
+        state = get_search_state()
+        if not state.alumni_profiles:
+            return state, [], [], None
+        search, token = launch_ranked_search(nl_query, state, page_size)
+        offset = 0
+
+    rows, scores, has_more = search.page(offset, page_size)
+    next_cursor = encode_cursor(token, offset + page_size) if has_more else None
+    return search.state, rows, scores, next_cursor
+
+def paginated_query(nl_query=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return one page of matches as a list of (name, similarity score) tuples
+    plus an opaque cursor for the next page (None on the last page).
+    """
+    state, rows, scores, next_cursor = paginated_rows(nl_query, cursor, page_size)
+    matches = [
+        (state.alumni_profiles.value(idx, "name", "Unknown"), float(score))
+        for idx, score in zip(rows, scores)
+    ]
+    return matches, next_cursor
+
+def result_rows(nl_query=None, cursor=None, count=DEFAULT_PAGE_SIZE * INITIAL_PAGES):
+    """
+    Return (state, row ids) of the top `count` results of a query, or of the
+    ranked list behind a cursor (without re-encoding the query).
+    """
+    if cursor:
+        search, _, _ = cached_search(cursor)
+    else:
+        state = get_search_state()
+        if not state.alumni_profiles:
+            return state, []
+        search = rank_query(nl_query, state, count)
+    search.ensure(count)
+    return search.state, search.ids[:count]
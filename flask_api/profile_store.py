@@ -0,0 +1,263 @@
+import json
+import os
+import sys
+from array import array
+from collections import Counter
+import numpy as np
+
+# ====== Profile Store Configuration ======
+# Low-cardinality properties stored as interned category codes; every other
+# property is kept in an offset-encoded UTF-8 buffer.
+CATEGORY_FIELDS = ["city", "us_state", "country", "industry", "function", "major",
+                   "employer", "grad_school", "class_year", "cluster_id"]
+
+# Per-row value kinds of a text column.
+MISSING, TEXT, JSON = 0, 1, 2
+
+def _hashable(value):
+    # Neo4j list properties arrive as lists; intern them as tuples.
+    return tuple(value) if isinstance(value, list) else value
+
+class CategoryColumn:
+    """
+    One code per row indexing into a list of distinct values (-1 = missing).
+    """
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+        self.lookup = {value: code for code, value in enumerate(categories)}
+
+    def value(self, row):
+        code = int(self.codes[row])
+        return self.categories[code] if code >= 0 else None
+
+    def mask(self, value):
+        code = self.lookup.get(_hashable(value))
+        return self.codes == code if code is not None else np.zeros(len(self.codes), dtype=bool)
+
+    def equals(self, row, value):
+        code = self.lookup.get(_hashable(value))
+        return code is not None and int(self.codes[row]) == code
+
+    def value_counts(self, rows=None):
+        codes = self.codes if rows is None else self.codes[np.asarray(rows, dtype=np.int64)]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories))
+        return {self.categories[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def nbytes(self):
+        return self.codes.nbytes + sum(sys.getsizeof(value) for value in self.categories)
+
+    def save(self, prefix):
+        np.save(f"{prefix}.codes.npy", self.codes)
+        return {"kind": "category", "categories": self.categories}
+
+    @classmethod
+    def load(cls, prefix, schema, mmap_mode=None):
+        categories = [_hashable(value) for value in schema["categories"]]
+        return cls(np.load(f"{prefix}.codes.npy", mmap_mode=mmap_mode), categories)
+
+class TextColumn:
+    """
+    All values of a property concatenated into one UTF-8 buffer; row i spans
+    data[offsets[i]:offsets[i + 1]]. Non-string values are stored as JSON.
+    """
+    def __init__(self, kinds, offsets, data):
+        self.kinds = kinds
+        self.offsets = offsets
+        self.data = data
+
+    def value(self, row):
+        kind = self.kinds[row]
+        if kind == MISSING:
+            return None
+        text = bytes(self.data[int(self.offsets[row]):int(self.offsets[row + 1])]).decode("utf-8")
+        return text if kind == TEXT else json.loads(text)
+
+    def mask(self, value):
+        return np.array([self.value(row) == value for row in range(len(self.kinds))], dtype=bool)
+
+    def equals(self, row, value):
+        return self.value(row) == value
+
+    def value_counts(self, rows=None):
+        counts = Counter(_hashable(self.value(row)) for row in (range(len(self.kinds)) if rows is None else rows))
+        counts.pop(None, None)
+        return dict(counts)
+
+    def nbytes(self):
+        return self.kinds.nbytes + self.offsets.nbytes + self.data.nbytes
+
+    def save(self, prefix):
+        np.save(f"{prefix}.kinds.npy", self.kinds)
+        np.save(f"{prefix}.offsets.npy", self.offsets)
+        np.save(f"{prefix}.data.npy", self.data)
+        return {"kind": "text"}
+
+    @classmethod
+    def load(cls, prefix, schema, mmap_mode=None):
+        return cls(*(np.load(f"{prefix}.{part}.npy", mmap_mode=mmap_mode) for part in ("kinds", "offsets", "data")))
+
+class _CategoryBuilder:
+    def __init__(self, rows):
+        self.codes = array('i', [-1]) * rows
+        self.categories = []
+        self.lookup = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+        value = _hashable(value)
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def finish(self):
+        codes = np.frombuffer(self.codes, dtype=np.int32)
+        if len(self.categories) < np.iinfo(np.int16).max:
+            codes = codes.astype(np.int16)
+        return CategoryColumn(codes.copy(), self.categories)
+
+class _TextBuilder:
+    def __init__(self, rows):
+        self.kinds = array('b', [MISSING]) * rows
+        self.offsets = array('q', [0]) * (rows + 1)
+        self.data = bytearray()
+
+    def append(self, value):
+        if value is None:
+            self.kinds.append(MISSING)
+        elif isinstance(value, str):
+            self.kinds.append(TEXT)
+            self.data += value.encode("utf-8")
+        else:
+            self.kinds.append(JSON)
+            self.data += json.dumps(value).encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def finish(self):
+        return TextColumn(np.frombuffer(self.kinds, dtype=np.int8).copy(),
+                          np.frombuffer(self.offsets, dtype=np.int64).copy(),
+                          np.frombuffer(bytes(self.data), dtype=np.uint8))
+
+class ProfileStore:
+    """
+    Columnar, read-only store of the serving profiles. Row i is the profile
+    behind vector i of the index. Indexing a row (store[i]) builds the profile
+    dict on demand, so only the returned hits are ever materialized; value()
+    and matches() read single fields without building a dict.
+    """
+    def __init__(self, length, columns):
+        self.length = length
+        self.columns = columns
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        """
+        Build a store from an iterable of profile dicts in a single pass.
+        """
+        builders = {}
+        rows = 0
+        for profile in profiles:
+            for field in profile:
+                if field not in builders:
+                    builder = _CategoryBuilder if field in CATEGORY_FIELDS else _TextBuilder
+                    builders[field] = builder(rows)
+            for field, builder in builders.items():
+                builder.append(profile.get(field))
+            rows += 1
+        return cls(rows, {field: builder.finish() for field, builder in builders.items()})
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, row):
+        row = int(row)
+        if row < 0:
+            row += self.length
+        if not 0 <= row < self.length:
+            raise IndexError("profile row out of range")
+        profile = {}
+        for field, column in self.columns.items():
+            value = column.value(row)
+            if value is not None:
+                profile[field] = list(value) if isinstance(value, tuple) else value
+        return profile
+
+    def __iter__(self):
+        for row in range(self.length):
+            yield self[row]
+
+    def project(self, row, fields=None):
+        """
+        {field: value} of the given fields of one row (every field when fields
+        is None); missing values are left out.
+        """
+        if fields is None:
+            return self[row]
+        projected = {}
+        for field in fields:
+            value = self.value(row, field)
+            if value is not None:
+                projected[field] = list(value) if isinstance(value, tuple) else value
+        return projected
+
+    def value(self, row, field, default=None):
+        column = self.columns.get(field)
+        value = column.value(int(row)) if column is not None else None
+        return default if value is None else value
+
+    def matches(self, row, filters):
+        """
+        True if the row has every {property: value} in filters.
+        """
+        for field, value in filters.items():
+            column = self.columns.get(field)
+            if column is None or not column.equals(int(row), value):
+                return False
+        return True
+
+    def filter_mask(self, filters):
+        """
+        Boolean mask of the rows matching every {property: value} in filters.
+        """
+        mask = np.ones(self.length, dtype=bool)
+        for field, value in filters.items():
+            column = self.columns.get(field)
+            mask &= column.mask(value) if column is not None else False
+        return mask
+
+    def value_counts(self, field, rows=None):
+        """
+        {value: count} of a property over every row, or over the given rows.
+        """
+        column = self.columns.get(field)
+        return column.value_counts(rows) if column is not None else {}
+
+    def memory_bytes(self):
+        return sum(column.nbytes() for column in self.columns.values())
+
+    def save(self, directory, prefix="profiles"):
+        """
+        Write every column as .npy files plus a {prefix}.schema.json.
+        """
+        schema = {"length": self.length, "fields": []}
+        for i, (field, column) in enumerate(self.columns.items()):
+            schema["fields"].append({"name": field, **column.save(os.path.join(directory, f"{prefix}.{i}"))})
+        with open(os.path.join(directory, f"{prefix}.schema.json"), "w", encoding="utf-8") as f:
+            json.dump(schema, f)
+
+    @classmethod
+    def load(cls, directory, prefix="profiles", mmap_mode='r'):
+        """
+        Open a saved store; with mmap_mode the columns are memory-mapped.
+        """
+        with open(os.path.join(directory, f"{prefix}.schema.json"), encoding="utf-8") as f:
+            schema = json.load(f)
+        columns = {}
+        for i, field in enumerate(schema["fields"]):
+            column_class = CategoryColumn if field["kind"] == "category" else TextColumn
+            columns[field["name"]] = column_class.load(os.path.join(directory, f"{prefix}.{i}"), field, mmap_mode)
+        return cls(schema["length"], columns)
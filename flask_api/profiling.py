@@ -0,0 +1,87 @@
+import os
+import re
+import time
+import random
+import cProfile
+import threading
+
+# ====== Profiling Configuration ======
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+PROFILE_HEADER = "X-Profile"   # send "X-Profile: 1" to profile a single request
+PROFILE_SAMPLE_RATE = 0.0      # fraction of requests profiled without the header
+MAX_PROFILES = 50              # oldest profiles are deleted beyond this
+
+# Only one cProfile profiler can be active per process at a time, so
+# concurrent requests are not profiled while another capture is running.
+_capture_lock = threading.Lock()
+
+def should_profile(headers, sample_rate=PROFILE_SAMPLE_RATE):
+    if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return sample_rate > 0 and random.random() < sample_rate
+
+def start_profile():
+    """
+    Start a CPU profile of the current thread. Returns the profiler, or None if
+    another request is already being profiled.
+    """
+    if not _capture_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def stop_profile(profiler, endpoint, elapsed):
+    """
+    Stop the profiler and write its stats (pstats format, readable by snakeviz,
+    flameprof or gprof2dot) into the on-disk ring. Returns the profile name,
+    or None if the profile could not be written; a failed capture never fails
+    the request it was profiling.
+    """
+    name = None
+    try:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^a-zA-Z0-9]+", "_", endpoint).strip("_") or "root"
+        name = f"{int(time.time() * 1000)}-{slug}-{int(elapsed * 1000)}ms.prof"
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+    except Exception as error:
+        print(f"Profile capture for {endpoint} failed: {error}")
+        return None
+    finally:
+        _capture_lock.release()
+    prune_profiles()
+    return name
+
+def prune_profiles(max_profiles=MAX_PROFILES):
+    profiles = list_profiles()
+    for profile in profiles[max_profiles:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, profile["name"]))
+        except FileNotFoundError:
+            pass
+
+def list_profiles():
+    """
+    List the stored profiles, newest first.
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(".prof"):
+            continue
+        path = os.path.join(PROFILE_DIR, name)
+        stat = os.stat(path)
+        profiles.append({"name": name, "bytes": stat.st_size, "created": stat.st_mtime})
+    profiles.sort(key=lambda p: p["name"], reverse=True)
+    return profiles
+
+def profile_path(name):
+    """
+    Return the path of a stored profile, or None if no profile has that name.
+    """
+    if name != os.path.basename(name) or not name.endswith(".prof"):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -1,17 +1,73 @@
 import os
 import json
+import time
+import threading
 import numpy as np
 from neo4j import GraphDatabase
-from sentence_transformers import SentenceTransformer
-import faiss  # Facebook AI Similarity Search
+from embedding_store import build_index, versioned_embeddings_path, remove_embedding_files
+from profile_store import ProfileStore
+from text_builder import TextBuilder, FIELD_PRIORITY
+from metrics import timed, index_size, index_version
+from admission import check_deadline
 
 # ====== Neo4j Connection Configuration ======
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "password"
 
-# Initialize the Sentence Transformer model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# ====== Index Configuration ======
+# "float32" keeps an exact flat index. "float16" or "int8" searches a compact
+# scalar-quantized index and rescores the top candidates against the
+# full-precision vectors memory-mapped from disk (see embedding_store.py).
+EMBEDDING_PRECISION = "float32"
+
+# ====== Search Backend Configuration ======
+# "faiss" searches the in-process index; "neo4j" answers queries with the Neo4j
+# vector index in one round trip (see neo4j_vector_backend.py).
+SEARCH_BACKEND = "faiss"
+# With filters, top_n * FILTER_CANDIDATE_FACTOR hits are ranked before filtering.
+FILTER_CANDIDATE_FACTOR = 10
+# Properties that can be used as exact-match filters, by either backend.
+FILTERABLE_FIELDS = ["city", "us_state", "country", "industry", "function", "major",
+                     "employer", "grad_school", "class_year", "cluster_id"]
+
+# ====== Snapshot Configuration ======
+# Cold start from the latest snapshot in flask_api/store/snapshots (see
+# snapshot.py) and only rebuild from Neo4j when there is none.
+USE_SNAPSHOTS = True
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# ====== Embedding Text Configuration ======
+# "budgeted" embeds the description first, then the fields it does not already
+# mention, within TOKEN_BUDGET tokens (see text_builder.py). "full" embeds
+# every populated field (build_profile_description).
+TEXT_BUILDER = "budgeted"
+# None uses the model's maximum sequence length (minus the special tokens).
+TOKEN_BUDGET = None
+
+# Same lists as profile_fields.py at the repository root (used by the
+# normalization and clustering scripts); the API runs from this directory,
+# so keep the two in sync.
+# Node properties that never go into the embedded profile text.
+EXCLUDED_FIELDS = ["name", "email", "aliases", "cluster_id", "embedding", "corpus_version", "updated_at"]
+# Values that carry no information (NaN / placeholders from the class lists).
+PLACEHOLDER_VALUES = ["", "-", "--", "n/a", "na", "none", "null", "nan", "unknown", "tbd"]
+
+# The Sentence Transformer model is only loaded on first use or by the warmup
+# in lifecycle.py. Together with the lazy faiss import in embedding_store.py
+# this keeps importing this module fast.
+model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(MODEL_NAME)
+    return model
 
 class GraphDB:
     def __init__(self, uri, user, password):
@@ -20,30 +76,62 @@ class GraphDB:
     def close(self):
         self.driver.close()
     
+    @timed("fetch_alumni_profiles")
     def fetch_alumni_profiles(self):
         """
         Fetch all alumni nodes (with at least 'name' and 'description' properties)
         from the database.
         Returns a list of dictionaries.
         """
-        query = "MATCH (s:Student) WHERE s.description IS NOT NULL RETURN s"
+        # The stored vector (see neo4j_vector_backend.py) is left out of the payload.
+        query = "MATCH (s:Student) WHERE s.description IS NOT NULL RETURN s {.*, embedding: null} AS s"
         profiles = []
         with self.driver.session() as session:
             result = session.run(query)
             for record in result:
-                node = dict(record["s"])
+                node = {key: value for key, value in record["s"].items() if value is not None}
                 if "name" in node and "description" in node:
                     profiles.append(node)
         return profiles
 
+    def fetch_corpus_version(self):
+        """
+        Return the current corpus version (0 if nothing has been written yet).
+        A single node lookup, cheap enough to poll.
+        """
+        query = "OPTIONAL MATCH (m:CorpusMeta {id: 'alumni'}) RETURN coalesce(m.version, 0) AS version"
+        with self.driver.session() as session:
+            return session.run(query).single()["version"]
+
+    @timed("fetch_alumni_changes")
+    def fetch_alumni_changes(self, since_version):
+        """
+        Fetch the alumni written and the names removed after since_version.
+        Returns (changed profiles, removed names).
+        """
+        changed_query = (
+            "MATCH (s:Student) WHERE s.corpus_version > $since AND s.description IS NOT NULL "
+            "RETURN s {.*, embedding: null} AS s"
+        )
+        removed_query = "MATCH (t:RemovedAlumni) WHERE t.corpus_version > $since RETURN t.name AS name"
+        with self.driver.session() as session:
+            changed = []
+            for record in session.run(changed_query, since=since_version):
+                node = {key: value for key, value in record["s"].items() if value is not None}
+                if "name" in node and "description" in node:
+                    changed.append(node)
+            removed = [record["name"] for record in session.run(removed_query, since=since_version)]
+        return changed, removed
+
+@timed("get_alumni_embeddings")
 def get_alumni_embeddings(alumnis):
     """
     Compute embeddings for each alumni's full profile description.
     Returns a NumPy array of normalized embeddings (float32).
     """
     # Build a description for each alumni.
-    descriptions = [build_profile_description(s) for s in alumnis]
-    embeddings = model.encode(descriptions)
+    descriptions = [profile_text(s) for s in alumnis]
+    embeddings = get_model().encode(descriptions)
     # Normalize embeddings so that cosine similarity equals inner product.
     norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
     embeddings = embeddings / norms
@@ -52,61 +140,318 @@ def get_alumni_embeddings(alumnis):
 def build_profile_description(alumni):
     """
     Construct a full profile description by concatenating key-value pairs
-    that are populated. Exclude 'name' and 'email' fields.
+    that are populated. Exclude the EXCLUDED_FIELDS ('name', 'email' and internal properties).
     """
     parts = []
     for key, value in alumni.items():
         if value is not None:
             str_val = str(value).strip()
-            if key.lower() not in ["name", "email"] and str_val and str_val.lower() != "null":
+            if key.lower() not in EXCLUDED_FIELDS and str_val and str_val.lower() not in PLACEHOLDER_VALUES:
                 parts.append(f"{key}: {str_val}")
     return " ".join(parts)
 
-def build_faiss_index(embeddings):
+_text_builder = None
+
+def load_tokenizer():
     """
-    Build a FAISS index (using inner product) for the given normalized embeddings.
+    (tokenizer, max_seq_length) of MODEL_NAME. Taken from the model when it is
+    already loaded; otherwise only the tokenizer files and the sentence
+    transformer config are read, so e.g. bulk_embed.py's parent process does
+    not load the model weights just to build texts.
     """
-    dim = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dim)
-    index.add(embeddings)
-    return index
+    if model is not None:
+        return model.tokenizer, model.max_seq_length
+    from huggingface_hub import hf_hub_download
+    from transformers import AutoTokenizer
+    repo = MODEL_NAME if "/" in MODEL_NAME else f"sentence-transformers/{MODEL_NAME}"
+    with open(hf_hub_download(repo, "sentence_bert_config.json"), encoding="utf-8") as f:
+        max_seq_length = json.load(f)["max_seq_length"]
+    return AutoTokenizer.from_pretrained(repo), max_seq_length
+
+def get_text_builder():
+    global _text_builder
+    if _text_builder is None:
+        tokenizer, max_seq_length = load_tokenizer()
+        budget = TOKEN_BUDGET or max_seq_length - 2
+        _text_builder = TextBuilder(tokenizer, budget, EXCLUDED_FIELDS, PLACEHOLDER_VALUES)
+    return _text_builder
 
-def query_faiss_index(nl_query, alumni_profiles, index, top_n=5):
+def text_config():
+    """
+    Everything that determines the embedded text of a profile; snapshots
+    built under a different configuration are not reused.
+    """
+    return {"builder": TEXT_BUILDER, "token_budget": TOKEN_BUDGET, "field_priority": FIELD_PRIORITY,
+            "excluded_fields": EXCLUDED_FIELDS, "placeholder_values": PLACEHOLDER_VALUES}
+
+def profile_text(alumni):
+    """
+    The text that is embedded for a profile, according to TEXT_BUILDER.
+    """
+    if TEXT_BUILDER == "budgeted":
+        return get_text_builder().build(alumni)
+    return build_profile_description(alumni)
+
+@timed("build_faiss_index")
+def build_faiss_index(embeddings, version=0):
+    """
+    Build a FAISS index (using inner product) for the given normalized embeddings,
+    stored at EMBEDDING_PRECISION. Quantized indexes keep their full-precision
+    vectors in a file per version, so a reload never rewrites a file in use.
+    """
+    return build_index(embeddings, EMBEDDING_PRECISION, versioned_embeddings_path(version))
+
+@timed("encode_query")
+def encode_query(nl_query):
+    """
+    Compute the normalized (float32) embedding of a natural language query.
+    Returns a (1, dim) array ready to be passed to index.search.
+    """
+    return encode_queries([nl_query])
+
+def encode_queries(nl_queries, batch_size=32):
+    """
+    Normalized (float32) embeddings of several queries, encoded batch_size at a time.
+    """
+    check_deadline("encode_query")
+    query_embeddings = get_model().encode(nl_queries, batch_size=batch_size)
+    query_embeddings = query_embeddings / np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+    return query_embeddings.astype('float32')
+
+class InvalidFilters(ValueError):
+    """
+    Raised for filters that are not a {property: value} object over FILTERABLE_FIELDS.
+    """
+
+def check_filters(filters):
+    if not filters:
+        return
+    if not isinstance(filters, dict):
+        raise InvalidFilters("filters must be an object of {property: value}")
+    unknown = sorted(set(filters) - set(FILTERABLE_FIELDS))
+    if unknown:
+        raise InvalidFilters(f"Unsupported filter fields: {', '.join(unknown)} "
+                             f"(supported: {', '.join(FILTERABLE_FIELDS)})")
+
+@timed("query_faiss_index")
+def query_faiss_rows(nl_query, alumni_profiles, index, top_n=5, filters=None):
     """
     Given a natural language query, compute its embedding, and query the FAISS index.
-    Returns the top matching alumni as a list of 2-tuples (name, similarity score).
+    `alumni_profiles` is a ProfileStore whose rows line up with the index.
+    Optional exact-match `filters` ({property: value}) are applied to the ranked hits.
+    Returns the top matches as a list of (row, similarity score) tuples.
     """
-    query_embedding = model.encode([nl_query])
-    # Normalize the query embedding.
-    query_embedding = query_embedding / np.linalg.norm(query_embedding, axis=1, keepdims=True)
-    query_embedding = query_embedding.astype('float32')
-    
-    distances, indices = index.search(query_embedding, top_n)
+    check_filters(filters)
+    query_embedding = encode_query(nl_query)
+    k = min(top_n * FILTER_CANDIDATE_FACTOR, index.ntotal) if filters else top_n
+    check_deadline("index_search")
+    distances, indices = index.search(query_embedding, k)
     matches = []
     for idx, score in zip(indices[0], distances[0]):
-        if idx < len(alumni_profiles):
-            name = alumni_profiles[idx].get("name", "Unknown")
-            matches.append((name, float(score)))
+        if 0 <= idx < len(alumni_profiles):
+            if filters and not alumni_profiles.matches(idx, filters):
+                continue
+            matches.append((int(idx), float(score)))
+            if len(matches) >= top_n:
+                break
     return matches
 
+def query_faiss_index(nl_query, alumni_profiles, index, top_n=5, filters=None):
+    """
+    Returns the top matching alumni as a list of 2-tuples (name, similarity score).
+    """
+    return [(alumni_profiles.value(idx, "name", "Unknown"), score)
+            for idx, score in query_faiss_rows(nl_query, alumni_profiles, index, top_n, filters)]
+
 def serve_profiles_with_embeddings(nl_query, alumni_profiles, top_n=5):
     """
     Use FAISS to retrieve the top matching alumni given a natural language query.
     """
     embeddings = get_alumni_embeddings(alumni_profiles)
     index = build_faiss_index(embeddings)
-    return query_faiss_index(nl_query, alumni_profiles, index, top_n)
+    return query_faiss_index(nl_query, ProfileStore.from_profiles(alumni_profiles), index, top_n)
+
+class SearchState:
+    """
+    Everything needed to answer a query: the alumni profiles (a ProfileStore),
+    their embeddings and the index built over them (row i of the index is
+    alumni_profiles[i]).
+    """
+    def __init__(self, alumni_profiles, embeddings, index, version=0):
+        self.alumni_profiles = alumni_profiles
+        self.embeddings = embeddings
+        self.index = index
+        self.version = version
+        # Set by apply_search_delta: (rows of the previous state that were
+        # removed or replaced, rows of this state that were added or updated),
+        # so derived structures can be updated incrementally. None after a full build.
+        self.delta_rows = None
 
-def launch_query(nl_query):
+def build_search_state(alumni_profiles, embeddings, version):
+    if not alumni_profiles:
+        return SearchState([], None, None, version=version)
+    if not isinstance(alumni_profiles, ProfileStore):
+        alumni_profiles = ProfileStore.from_profiles(alumni_profiles)
+    index = build_faiss_index(embeddings, version)
+    # Quantized indexes rescore from the memory-mapped file; keep that instead
+    # of a second in-memory copy.
+    embeddings = getattr(index, "full_precision", embeddings)
+    return SearchState(alumni_profiles, embeddings, index, version=version)
+
+def load_search_state(timings=None):
+    """
+    Fetch the alumni profiles from Neo4j, embed them and build the index.
+    If a `timings` dict is given, the seconds spent in each step are recorded in it.
+    """
+    timings = {} if timings is None else timings
+
+    started = time.perf_counter()
     db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    # Read the version first: writes that land while fetching are re-applied
+    # by the next reload, which is harmless.
+    version = db.fetch_corpus_version()
     alumni_profiles = db.fetch_alumni_profiles()
     db.close()
-    
+    timings["fetch_profiles"] = time.perf_counter() - started
+
     if not alumni_profiles:
+        return SearchState([], None, None, version=version)
+
+    started = time.perf_counter()
+    embeddings = get_alumni_embeddings(alumni_profiles)
+    timings["embed_profiles"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    state = build_search_state(alumni_profiles, embeddings, version)
+    timings["build_index"] = time.perf_counter() - started
+    return state
+
+@timed("apply_search_delta")
+def apply_search_delta(state, changed, removed, version):
+    """
+    Return a new SearchState with the removed alumni dropped and the changed
+    alumni updated or appended. Only profiles whose embedded text changed are
+    re-encoded; every other embedding is reused. `state` itself is not modified.
+    """
+    changed_by_name = {profile["name"]: profile for profile in changed}
+    removed = set(removed) - set(changed_by_name)
+    old_profiles = state.alumni_profiles
+
+    kept_rows = []
+    reencode = []
+    reencode_profiles = []
+    replaced_rows = []
+    updated_rows = []
+
+    def merged_profiles():
+        # Streamed into the new ProfileStore, so at most one old profile is
+        # materialized as a dict at a time.
+        for row in range(len(old_profiles)):
+            name = old_profiles.value(row, "name")
+            if name in removed:
+                replaced_rows.append(row)
+                continue
+            profile = old_profiles[row]
+            if name in changed_by_name:
+                replaced_rows.append(row)
+                updated_rows.append(len(kept_rows))
+                updated = changed_by_name.pop(name)
+                if profile_text(updated) != profile_text(profile):
+                    reencode.append(len(kept_rows))
+                    reencode_profiles.append(updated)
+                profile = updated
+            kept_rows.append(row)
+            yield profile
+        # Whatever is left in changed_by_name is new.
+        for profile in changed_by_name.values():
+            updated_rows.append(len(kept_rows))
+            reencode.append(len(kept_rows))
+            reencode_profiles.append(profile)
+            kept_rows.append(-1)
+            yield profile
+
+    profiles = ProfileStore.from_profiles(merged_profiles())
+    if not len(profiles):
+        return SearchState([], None, None, version=version)
+
+    dim = state.embeddings.shape[1] if state.embeddings is not None else None
+    if reencode:
+        fresh = get_alumni_embeddings(reencode_profiles)
+        dim = fresh.shape[1]
+    embeddings = np.zeros((len(profiles), dim), dtype='float32')
+    kept = np.array(kept_rows)
+    reused = kept >= 0
+    if reused.any():
+        embeddings[reused] = state.embeddings[kept[reused]]
+    if reencode:
+        embeddings[reencode] = fresh
+    new_state = build_search_state(profiles, embeddings, version)
+    new_state.delta_rows = (replaced_rows, updated_rows)
+    return new_state
+
+def open_search_state(timings=None):
+    """
+    Memory-map the latest valid snapshot, falling back to a full rebuild
+    (which is then snapshotted for the next start).
+    """
+    if not USE_SNAPSHOTS:
+        return load_search_state(timings)
+    # Imported here because the snapshot module builds on this one.
+    from snapshot import load_latest_state, write_snapshot
+    state = load_latest_state(timings)
+    if state is None:
+        state = load_search_state(timings)
+        write_snapshot(state)
+    return state
+
+# Built once (normally by the warmup in lifecycle.py) and shared by all
+# requests. Reloads build a complete new SearchState and swap the reference,
+# so a request that already holds a state keeps a consistent view and reads
+# never wait on a reload.
+_search_state = None
+_search_state_lock = threading.Lock()
+
+def get_search_state(timings=None):
+    if _search_state is None:
+        with _search_state_lock:
+            if _search_state is None:
+                set_search_state(open_search_state(timings))
+    return _search_state
+
+def set_search_state(state):
+    global _search_state
+    _search_state = state
+    index_size.set(len(state.alumni_profiles))
+    index_version.set(state.version)
+    if EMBEDDING_PRECISION != "float32":
+        # Older vector files stay readable by in-flight requests until they
+        # release them (the memory maps keep the unlinked files alive).
+        remove_embedding_files(keep=versioned_embeddings_path(state.version))
+
+def launch_query(nl_query, top_n=5, filters=None):
+    """
+    Returns the top matching alumni as a list of (name, similarity score) tuples.
+    """
+    return [(hit["name"], hit["score"]) for hit in launch_query_hits(nl_query, top_n, filters, fields=[])]
+
+@timed("launch_query")
+def launch_query_hits(nl_query, top_n=5, filters=None, fields=None):
+    """
+    Like launch_query, but returns [{"name", "score", *fields}]: the requested
+    properties of every hit (all of them when fields is None) are read in the
+    same pass, from the ProfileStore or the same Cypher statement.
+    """
+    if SEARCH_BACKEND == "neo4j":
+        # Imported here because the backend module builds on this one.
+        from neo4j_vector_backend import launch_vector_index_query
+        return launch_vector_index_query(nl_query, top_n, filters, fields=fields if fields is not None else ["*"])
+
+    state = get_search_state()
+    if not state.alumni_profiles:
         return []
-    
-    top_matches = serve_profiles_with_embeddings(nl_query, alumni_profiles, top_n=5)
-    return top_matches
+    return [{**state.alumni_profiles.project(idx, fields), "name": state.alumni_profiles.value(idx, "name", "Unknown"),
+             "score": score}
+            for idx, score in query_faiss_rows(nl_query, state.alumni_profiles, state.index, top_n, filters)]
 
 if __name__ == "__main__":
     query = input("Search Alumni: ")
@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+import serve_profile
+from serve_profile import SearchState, GraphDB, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from embedding_store import STORE_DIR, MemmapFlatIndex, RescoringIndex
+from profile_store import ProfileStore
+
+# ====== Snapshot Configuration ======
+SNAPSHOT_DIR = os.path.join(STORE_DIR, "snapshots")
+LATEST_FILE = os.path.join(SNAPSHOT_DIR, "LATEST")
+KEEP_SNAPSHOTS = 3              # older snapshot directories are deleted
+# Startup checks file sizes only, so it stays flat as the corpus grows. Set
+# True to also hash every file against the manifest (about a second per GB);
+# `python snapshot.py verify` always hashes.
+VERIFY_CHECKSUMS_ON_LOAD = False
+SNAPSHOT_FORMAT = 2               # bumped whenever the layout below changes
+
+# Layout of a snapshot directory:
+#   manifest.json           version, model, precision, row count and sha256/size per file
+#   embeddings.npy          float32 matrix, row i belongs to profile i
+#   profiles.*              the ProfileStore columns (see profile_store.py), row i is vector i
+#   index.faiss             compact quantized index (only when EMBEDDING_PRECISION is not float32)
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_snapshot(state):
+    """
+    Write the SearchState to a new versioned snapshot directory with a
+    checksum manifest, then point LATEST at it. The directory is written
+    under a temporary name and renamed, so readers never see a partial snapshot.
+    Returns the snapshot path.
+    """
+    import faiss
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    name = f"v{state.version}-{int(time.time())}"
+    # Several API processes may snapshot the same version at once.
+    tmp_path = os.path.join(SNAPSHOT_DIR, f".{name}.{os.getpid()}.tmp")
+    os.makedirs(tmp_path)
+
+    np.save(os.path.join(tmp_path, "embeddings.npy"),
+            np.ascontiguousarray(state.embeddings, dtype='float32') if len(state.alumni_profiles)
+            else np.zeros((0, 0), dtype='float32'))
+    profiles = state.alumni_profiles
+    if not isinstance(profiles, ProfileStore):
+        profiles = ProfileStore.from_profiles(profiles)
+    profiles.save(tmp_path)
+    if isinstance(state.index, RescoringIndex):
+        faiss.write_index(state.index.compact_index, os.path.join(tmp_path, "index.faiss"))
+
+    files = {
+        filename: {"sha256": _sha256(os.path.join(tmp_path, filename)),
+                   "bytes": os.path.getsize(os.path.join(tmp_path, filename))}
+        for filename in sorted(os.listdir(tmp_path))
+    }
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": state.version,
+        "created_at": time.time(),
+        "model": serve_profile.MODEL_NAME,
+        "precision": serve_profile.EMBEDDING_PRECISION,
+        "text_config": serve_profile.text_config(),
+        "count": len(state.alumni_profiles),
+        "files": files,
+    }
+    with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    path = os.path.join(SNAPSHOT_DIR, name)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+        # Another process wrote the same snapshot first.
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    with open(LATEST_FILE + ".tmp", "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(LATEST_FILE + ".tmp", LATEST_FILE)
+    prune_snapshots()
+    return path
+
+def snapshot_names():
+    """
+    Names of the snapshot directories, newest first.
+    """
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return sorted((n for n in os.listdir(SNAPSHOT_DIR) if n.startswith("v")),
+                  key=lambda n: os.path.getmtime(os.path.join(SNAPSHOT_DIR, n)), reverse=True)
+
+def prune_snapshots(keep=KEEP_SNAPSHOTS):
+    for name in snapshot_names()[keep:]:
+        # Open memory maps keep the deleted files readable for running processes.
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+
+def read_manifest(path, verify_checksums=False):
+    """
+    Return the manifest of a snapshot directory, or None if the snapshot is
+    invalid: an older layout, missing files, sizes (or, if requested,
+    checksums) that do not match, or a model, precision or text
+    configuration (builder, token budget, field priority, ...) different
+    from the current one.
+    """
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        for filename, expected in manifest["files"].items():
+            file_path = os.path.join(path, filename)
+            if os.path.getsize(file_path) != expected["bytes"]:
+                return None
+            if verify_checksums and _sha256(file_path) != expected["sha256"]:
+                return None
+    except (OSError, ValueError, KeyError):
+        return None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    if (manifest.get("model") != serve_profile.MODEL_NAME
+            or manifest.get("precision") != serve_profile.EMBEDDING_PRECISION
+            or manifest.get("text_config") != serve_profile.text_config()):
+        return None
+    return manifest
+
+def latest_snapshot_path():
+    try:
+        with open(LATEST_FILE, encoding="utf-8") as f:
+            return os.path.join(SNAPSHOT_DIR, f.read().strip())
+    except OSError:
+        return None
+
+def find_valid_snapshot(verify_checksums=VERIFY_CHECKSUMS_ON_LOAD):
+    """
+    (path, manifest) of the snapshot LATEST points at or, if that one is
+    missing or does not verify, of the newest older snapshot that does.
+    (None, None) when no snapshot is usable.
+    """
+    latest = latest_snapshot_path()
+    candidates = [latest] if latest else []
+    candidates += [os.path.join(SNAPSHOT_DIR, name) for name in snapshot_names()
+                   if os.path.join(SNAPSHOT_DIR, name) != latest]
+    for path in candidates:
+        manifest = read_manifest(path, verify_checksums)
+        if manifest is not None:
+            if path != latest:
+                print(f"Snapshot '{latest}' is missing or invalid; falling back to '{path}'.")
+            return path, manifest
+    return None, None
+
+def load_snapshot(path, manifest):
+    """
+    Open a snapshot as a SearchState by memory-mapping its files.
+    """
+    import faiss
+
+    profiles = ProfileStore.load(path, mmap_mode='r')
+    if len(profiles) == 0:
+        return SearchState([], None, None, version=manifest["version"])
+    embeddings_path = os.path.join(path, "embeddings.npy")
+    embeddings = np.load(embeddings_path, mmap_mode='r')
+    if os.path.exists(os.path.join(path, "index.faiss")):
+        index = RescoringIndex(faiss.read_index(os.path.join(path, "index.faiss")), embeddings_path)
+    else:
+        index = MemmapFlatIndex(embeddings)
+    return SearchState(profiles, embeddings, index, version=manifest["version"])
+
+def load_latest_state(timings=None):
+    """
+    Cold-start the serving state from the latest valid snapshot (see
+    find_valid_snapshot). A snapshot
+    older than the graph is brought up to date by applying only the changes
+    since its version; the result is snapshotted and re-opened memory-mapped,
+    so the next start does not apply the same changes again. Returns None
+    when there is no usable snapshot (missing, invalid, or the graph was
+    reset), in which case the caller rebuilds.
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    path, manifest = find_valid_snapshot()
+    if manifest is None:
+        return None
+    state = load_snapshot(path, manifest)
+    timings["load_snapshot"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    try:
+        version = db.fetch_corpus_version()
+        if version < state.version:
+            return None
+        if version > state.version:
+            changed, removed = db.fetch_alumni_changes(state.version)
+            state = serve_profile.apply_search_delta(state, changed, removed, version)
+    finally:
+        db.close()
+    timings["apply_snapshot_delta"] = time.perf_counter() - started
+
+    if state.version != manifest["version"]:
+        started = time.perf_counter()
+        path = write_snapshot(state)
+        state = load_snapshot(path, read_manifest(path))
+        timings["write_snapshot"] = time.perf_counter() - started
+    return state
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "verify":
+        path = latest_snapshot_path()
+        manifest = read_manifest(path, verify_checksums=True) if path else None
+        print(f"Snapshot '{path}' is {'valid' if manifest else 'missing or invalid'}.")
+        return
+    print("Building serving state from Neo4j...")
+    state = serve_profile.load_search_state()
+    path = write_snapshot(state)
+    print(f"Wrote snapshot of {len(state.alumni_profiles)} profiles (corpus version {state.version}) to '{path}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import re
+
+# ====== Text Builder Configuration ======
+# Fields in the order they are kept when the token budget runs out. Fields not
+# listed here follow in node order.
+FIELD_PRIORITY = ["description", "function", "industry", "employer", "major",
+                  "grad_school", "city", "us_state", "country", "class_year"]
+
+class TextBuilder:
+    """
+    Builds the text that is embedded for a profile: the LLM `description`
+    first, then the raw fields by FIELD_PRIORITY, skipping values the
+    description already mentions, and stopping at `budget` tokens of the
+    model's tokenizer so nothing is silently truncated by the encoder.
+    """
+    def __init__(self, tokenizer, budget, excluded_fields=(), placeholder_values=(), priority=FIELD_PRIORITY):
+        self.tokenizer = tokenizer
+        self.budget = budget
+        self.excluded_fields = set(excluded_fields)
+        self.placeholder_values = set(placeholder_values)
+        self.priority = {field: rank for rank, field in enumerate(priority)}
+
+    def parts(self, alumni):
+        """
+        The candidate text fragments of a profile, highest priority first.
+        """
+        values = []
+        for key, value in alumni.items():
+            if value is None or key.lower() in self.excluded_fields:
+                continue
+            str_val = str(value).strip()
+            if str_val and str_val.lower() not in self.placeholder_values:
+                values.append((key, str_val))
+        values.sort(key=lambda item: self.priority.get(item[0], len(self.priority)))
+
+        description = next((str_val for key, str_val in values if key == "description"), "")
+        parts = [description] if description else []
+        for key, str_val in values:
+            if key == "description" or self.mentions(description, str_val):
+                continue
+            parts.append(f"{key}: {str_val}")
+        return parts
+
+    @staticmethod
+    def mentions(text, value):
+        return bool(text) and re.search(rf"(?<!\w){re.escape(value)}(?!\w)", text, re.IGNORECASE) is not None
+
+    def build(self, alumni):
+        parts = self.parts(alumni)
+        if not parts:
+            return ""
+        lengths = [len(ids) for ids in self.tokenizer(parts, add_special_tokens=False)["input_ids"]]
+        kept = []
+        used = 0
+        for part, length in zip(parts, lengths):
+            if used + length <= self.budget:
+                kept.append(part)
+                used += length
+            elif not kept:
+                # The top-priority fragment alone is over budget: cut it at a token boundary.
+                ids = self.tokenizer(part, add_special_tokens=False)["input_ids"][:self.budget]
+                kept.append(self.tokenizer.decode(ids))
+                used = self.budget
+        return " ".join(kept)
@@ -0,0 +1,125 @@
+import re
+import threading
+import unicodedata
+import numpy as np
+
+import serve_profile
+
+# ====== Typeahead Configuration ======
+TYPEAHEAD_FIELDS = ["name", "employer", "city", "major"]
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 50
+# Keys are stored as fixed-width ASCII; longer prefixes are cut to this length.
+MAX_KEY_LENGTH = 32
+
+def normalize(text):
+    """
+    Lower-case, accent-free words separated by single spaces ("Stowell-Evans" -> "stowell evans").
+    """
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+def word_starts(key):
+    """
+    The key and every suffix of it that starts a word, so "goldman sachs"
+    completes both "gol" and "sac".
+    """
+    yield key
+    for match in re.finditer(" ", key):
+        yield key[match.end():]
+
+class PrefixIndex:
+    """
+    Sorted array of normalized keys searched with binary search
+    (np.searchsorted), each pointing at a (field, value) and its frequency in
+    the corpus. A prefix selects a contiguous slice of keys; its most frequent
+    values are picked with argpartition, so even one-letter prefixes over a
+    large corpus take a few milliseconds at most.
+    """
+    def __init__(self, store, version=0, fields=TYPEAHEAD_FIELDS):
+        self.version = version
+        self.fields = fields
+        self.values = []        # value id -> (field, value)
+        counts = []             # value id -> number of profiles with it
+        keys, key_values = [], []
+        if len(store):
+            for field in fields:
+                for value, count in store.value_counts(field).items():
+                    if not isinstance(value, str):
+                        continue
+                    value_id = len(self.values)
+                    self.values.append((field, value))
+                    counts.append(count)
+                    for key in word_starts(normalize(value)):
+                        if key:
+                            keys.append(key[:MAX_KEY_LENGTH].encode("ascii"))
+                            key_values.append(value_id)
+        keys = np.array(keys, dtype=f"S{MAX_KEY_LENGTH}")
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.key_values = np.array(key_values, dtype=np.int32)[order]
+        self.counts = np.array(counts, dtype=np.int32)
+        self.value_fields = np.array([fields.index(field) for field, _ in self.values], dtype=np.int8)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix, limit=DEFAULT_LIMIT, fields=None):
+        """
+        Up to `limit` [{"value", "field", "count"}] whose words start with
+        prefix, most frequent first (ties alphabetical).
+        """
+        prefix = normalize(prefix)[:MAX_KEY_LENGTH].encode("ascii")
+        if not prefix or not len(self.keys):
+            return []
+        lo = np.searchsorted(self.keys, prefix, side="left")
+        hi = np.searchsorted(self.keys, prefix + b"\xff", side="left")
+        value_ids = self.key_values[lo:hi]
+        if fields:
+            allowed = [self.fields.index(field) for field in fields if field in self.fields]
+            value_ids = value_ids[np.isin(self.value_fields[value_ids], allowed)]
+        if not len(value_ids):
+            return []
+        # A value can match under several of its words; keep it once.
+        value_ids = np.unique(value_ids)
+        counts = self.counts[value_ids]
+        if len(value_ids) > limit:
+            top = np.argpartition(-counts, limit - 1)[:limit]
+            value_ids, counts = value_ids[top], counts[top]
+        completions = sorted(zip(-counts, (self.values[v][1] for v in value_ids), value_ids.tolist()))
+        return [{"value": value, "field": self.values[value_id][0], "count": int(-negative_count)}
+                for negative_count, value, value_id in completions]
+
+class Typeahead:
+    """
+    The PrefixIndex per SearchState version, built for the incoming version
+    by the CorpusReloader listener before the swap (or lazily on the next
+    request). The serving and the incoming version's indexes are kept.
+    """
+    def __init__(self):
+        self.indexes = {}       # version -> PrefixIndex
+        self._lock = threading.Lock()
+
+    def rebuild(self, state, keep=None):
+        with self._lock:
+            index = self.indexes.get(state.version)
+            if index is None:
+                index = PrefixIndex(state.alumni_profiles, state.version)
+                self.indexes = {version: existing for version, existing in self.indexes.items() if version == keep}
+                self.indexes[state.version] = index
+        return index
+
+    def on_reload(self, state, previous_state):
+        """
+        CorpusReloader listener.
+        """
+        self.rebuild(state, keep=previous_state.version)
+
+    def get(self):
+        state = serve_profile.get_search_state()
+        index = self.indexes.get(state.version)
+        if index is None:
+            index = self.rebuild(state)
+        return index
+
+typeahead = Typeahead()
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+# ====== Response Cache Configuration ======
+CACHE_FILE = "./output/gpt_response_cache.sqlite3"
+CACHE_TTL_SECONDS = 7 * 24 * 3600  # entries older than this are treated as misses
+CACHE_MAX_ENTRIES = 10000          # least recently used entries are evicted beyond this
+
+def normalize_query(nl_query):
+    """
+    Lowercase and collapse whitespace so trivially different spellings of the
+    same query share a cache entry.
+    """
+    return " ".join(nl_query.lower().split())
+
+def fingerprint(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def make_cache_key(nl_query, alumni_context, model, prompt_template, endpoint):
+    """
+    Key a response by the normalized query, a fingerprint of the candidate set
+    (the exact profile context sent in the prompt), the model, the prompt
+    template and the API endpoint (base URL) that answered it, so answers from
+    a local stub are never served for the real API. Any change to one of them
+    produces a different key.
+    """
+    parts = {
+        "query": normalize_query(nl_query),
+        "candidates": fingerprint(alumni_context),
+        "model": model,
+        "template": fingerprint(prompt_template),
+        "endpoint": endpoint,
+    }
+    return fingerprint(json.dumps(parts, sort_keys=True))
+
+class ResponseCache:
+    """
+    Persistent (SQLite) cache of GPT responses with TTL and size-based LRU
+    eviction. Hit and miss counts are persisted so the hit rate covers every run.
+    """
+    def __init__(self, path=CACHE_FILE, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                prompt_tokens INTEGER,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+            CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _count(self, name, amount=1):
+        self.conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (amount, name))
+
+    def get(self, key):
+        """
+        Return the cached {"response", "prompt_tokens"} for key, or None on a
+        miss or if the entry has expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, prompt_tokens, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[2] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count("evictions")
+                row = None
+            if row is None:
+                self._count("misses")
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            self.conn.commit()
+            return {"response": row[0], "prompt_tokens": row[1]}
+
+    def put(self, key, response, prompt_tokens=None):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, response, prompt_tokens, now, now),
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        expired = self.conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self.conn.execute("SELECT count(*) FROM responses").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)", (overflow,)
+            )
+        self._count("evictions", expired + max(overflow, 0))
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = self.conn.execute("SELECT count(*) FROM responses").fetchone()[0]
+        lookups = counts["hits"] + counts["misses"]
+        counts["entries"] = entries
+        counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        return counts
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.execute("UPDATE stats SET value = 0")
+            self.conn.commit()
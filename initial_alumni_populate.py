@@ -1,6 +1,8 @@
-import pandas as pd
 import json
 from neo4j import GraphDatabase
+from corpus_version import bump_corpus_version
+from excel_cache import load_class_list
+from profile_normalization import normalize_class_list, to_properties, savings_report, print_savings
 
 # ====== Excel File Configuration ======
 EXCEL_FILE = "./data/2020_YC_Class_List.xlsx"  # Path to your Excel file
@@ -40,19 +42,24 @@ class GraphDB:
         
         query = (
             "MERGE (s:Student {name: $name}) "
-            "SET s += $props "
+            "SET s += $props, s.corpus_version = $version, s.updated_at = timestamp() "
             "RETURN s"
         )
+        # Record the change so the API picks it up (see corpus_version.py).
+        version = bump_corpus_version(tx)
         # We'll remove the 'name' from the properties dict so we don't overwrite the key.
         props = alumni_info.copy()
         props.pop("name", None)
-        result = tx.run(query, name=name, props=props)
+        result = tx.run(query, name=name, props=props, version=version)
         record = result.single()
         return record[0] if record else None
 
 def main():
-    # Read the Excel file using pandas
-    df = pd.read_excel(EXCEL_FILE)
+    # Read the class list (parsed once, then served from the Parquet cache)
+    raw_df = load_class_list(EXCEL_FILE)
+    # Drop NaN / placeholder values and canonicalize city, state and employer
+    df = normalize_class_list(raw_df)
+    print_savings(savings_report(raw_df, df))
 
     # Initialize the graph database connection
     graph_db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
@@ -61,25 +68,24 @@ def main():
     max_alumni = 20
 
     # Iterate through each row of the DataFrame
-    for index, row in df.iterrows():
+    for index, row in enumerate(to_properties(df)):
         # Stop if we reach the maximum alumni
         if index >= max_alumni:
             break
 
         # Build a dictionary of alumni properties from the Excel columns
         alumni_info = {
-            # "Student" is used as the 'name' property in the DB
-            "name": str(row.get("Student", "")).strip(),
-            "email": row.get("Email", ""),
-            "country": row.get("Country (if outside the U.S.)", ""),
-            "us_state": row.get("U.S. State", ""),
-            "city": row.get("City", ""),
-            "grad_school": row.get("Graduate/Professional School", ""),
-            "employer": row.get("Employer", ""),
-            "industry": row.get("Industry", ""),
-            "function": row.get("Function (Role)", ""),
-            "major": row.get("Major", "")
-            
+            "name": str(row.get("name") or "").strip(),
+            "email": row.get("email", ""),
+            "country": row.get("country", ""),
+            "us_state": row.get("us_state", ""),
+            "city": row.get("city", ""),
+            "grad_school": row.get("grad_school", ""),
+            "employer": row.get("employer", ""),
+            "industry": row.get("industry", ""),
+            "function": row.get("function", ""),
+            "major": row.get("major", ""),
+            "class_year": row.get("class_year")
         }
 
         # Print for debugging
@@ -2,18 +2,42 @@
 
 import { useState } from 'react';
 
+type StreamEvent = { event: string; data: any };
+
+// Split a Server-Sent Events buffer into complete events plus the unparsed remainder.
+function parseEvents(buffer: string): { events: StreamEvent[]; rest: string } {
+  const chunks = buffer.split('\n\n');
+  const rest = chunks.pop() ?? '';
+  const events = chunks.map((chunk) => {
+    let event = 'message';
+    let data = '';
+    for (const line of chunk.split('\n')) {
+      if (line.startsWith('event: ')) event = line.slice(7);
+      else if (line.startsWith('data: ')) data += line.slice(6);
+    }
+    return { event, data: data ? JSON.parse(data) : null };
+  });
+  return { events, rest };
+}
+
 export default function Home() {
   const [query, setQuery] = useState('');
   const [result, setResult] = useState<string | null>(null);
+  const [profiles, setProfiles] = useState<Record<string, any>[]>([]);
+  const [explanation, setExplanation] = useState<string | null>(null);
   const [error, setError] = useState('');
 
   const handleSubmit = async (event: React.FormEvent) => {
     event.preventDefault();
     setError('');
     setResult(null);
+    setProfiles([]);
+    setExplanation(null);
 
     try {
-      const response = await fetch('http://127.0.0.1:5000/api/query', {
+      // The streaming endpoint sends the vector-search hits first and the
+      // profile details / explanation as they become available.
+      const response = await fetch('http://127.0.0.1:5000/api/query/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -21,18 +45,35 @@ export default function Home() {
         body: JSON.stringify({ query }),
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`Error: ${response.statusText}`);
       }
 
-      const data = await response.json();
-      console.log("API response:", data);
-      if (data.error) {
-        setError(data.error);
-      } else if (data.matches) {
-        setResult(JSON.stringify(data.matches, null, 2));
-      } else {
-        setError("No matching alumni found.");
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const { events, rest } = parseEvents(buffer);
+        buffer = rest;
+        for (const { event: name, data } of events) {
+          if (name === 'hits') {
+            console.log("API response:", data);
+            if (data.matches.length) {
+              setResult(JSON.stringify(data.matches, null, 2));
+            } else {
+              setError("No matching alumni found.");
+            }
+          } else if (name === 'profile') {
+            setProfiles((previous) => [...previous, data]);
+          } else if (name === 'explanation') {
+            setExplanation(data.explanation);
+          } else if (name === 'error') {
+            setError(data.error);
+          }
+        }
       }
     } catch (err: any) {
       setError(err.message);
@@ -124,6 +165,24 @@ export default function Home() {
             </pre>
           </div>
         )}
+        {profiles.length > 0 && (
+          <div style={{ marginTop: "1rem" }}>
+            <h3 style={{ fontSize: "1.25rem", marginBottom: "0.5rem", color: "#111" }}>Profiles:</h3>
+            {profiles.map((profile, idx) => (
+              <p key={idx} style={{ marginBottom: "0.5rem", color: "#333" }}>
+                <strong>{profile.name}</strong>
+                {[profile.employer, profile.city, profile.industry].filter(Boolean).length > 0 &&
+                  ` — ${[profile.employer, profile.city, profile.industry].filter(Boolean).join(", ")}`}
+              </p>
+            ))}
+          </div>
+        )}
+        {explanation && (
+          <div style={{ marginTop: "1rem" }}>
+            <h3 style={{ fontSize: "1.25rem", marginBottom: "0.5rem", color: "#111" }}>Why these alumni:</h3>
+            <p style={{ color: "#333", whiteSpace: "pre-wrap" }}>{explanation}</p>
+          </div>
+        )}
       </section>
     </div>
   );
@@ -0,0 +1,10 @@
+# Field conventions shared by the ingest scripts (normalization, clustering,
+# embedding). flask_api/serve_profile.py mirrors these lists for the API,
+# which is deployed from its own directory; keep the two in sync.
+
+# Node properties that never go into the embedded profile text.
+EXCLUDED_FIELDS = ["name", "email", "aliases", "cluster_id", "embedding", "corpus_version", "updated_at"]
+# Values that carry no information (NaN / placeholders from the class lists).
+# Normalization drops them before writing and the embedder skips them, so
+# both stages agree on what counts as empty.
+PLACEHOLDER_VALUES = ["", "-", "--", "n/a", "na", "none", "null", "nan", "unknown", "tbd"]
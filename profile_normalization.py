@@ -0,0 +1,132 @@
+# Normalization stage between the class list cache (excel_cache.py) and the
+# Neo4j writes. Works column-wise on the whole DataFrame:
+#   - trims and collapses whitespace,
+#   - turns placeholders ("-", "n/a", ...) and NaN into missing values,
+#   - canonicalizes us_state (abbreviations -> full names) and city / employer
+#     spellings (known aliases, then the most frequent spelling of each
+#     case-insensitive variant, e.g. "citigroup, inc" -> "Citigroup, Inc.").
+# Missing values are written as null, which removes the property from the
+# node instead of storing NaN or "-".
+#
+# python profile_normalization.py [workbook ...] prints the bytes and tokens
+# saved per profile without writing anything.
+import re
+import sys
+import glob
+import json
+import pandas as pd
+
+from excel_cache import DATA_GLOB, COLUMN_MAP, load_class_lists
+from profile_fields import EXCLUDED_FIELDS, PLACEHOLDER_VALUES
+
+# ====== Normalization Configuration ======
+TEXT_COLUMNS = list(COLUMN_MAP.values())
+CANONICAL_COLUMNS = ["city", "employer"]
+CITY_ALIASES = {
+    "nyc": "New York",
+    "new york city": "New York",
+    "sf": "San Francisco",
+    # Kept apart from Washington state ("WA" -> "Washington").
+    "washington dc": "Washington, DC",
+    "washington, dc": "Washington, DC",
+    "washington d.c.": "Washington, DC",
+    "washington, d.c.": "Washington, DC",
+    "la": "Los Angeles",
+}
+US_STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "PR": "Puerto Rico",
+}
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def _most_frequent_spelling(series):
+    """
+    Map every value to the most common spelling among the values that only
+    differ in case and trailing punctuation.
+    """
+    keys = series.str.casefold().str.rstrip(".,")
+    counts = pd.DataFrame({"key": keys, "value": series}).dropna().value_counts()
+    canonical = counts.reset_index().drop_duplicates("key").set_index("key")["value"]
+    return keys.map(canonical).astype("string")
+
+def normalize_class_list(df):
+    """
+    Return a normalized copy of a class list DataFrame (excel_cache schema).
+    """
+    df = df.copy()
+    placeholders = set(PLACEHOLDER_VALUES)
+    for column in TEXT_COLUMNS:
+        values = df[column].astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+        df[column] = values.mask(values.str.lower().isin(placeholders))
+
+    upper = df["us_state"].str.upper().str.replace(".", "", regex=False)
+    df["us_state"] = upper.map(US_STATES).astype("string").fillna(df["us_state"])
+    df["city"] = df["city"].str.lower().map(CITY_ALIASES).astype("string").fillna(df["city"])
+    in_dc = df["city"].str.lower().eq("washington") & df["us_state"].eq("District of Columbia")
+    df["city"] = df["city"].mask(in_dc.fillna(False), "Washington, DC")
+    for column in CANONICAL_COLUMNS:
+        df[column] = _most_frequent_spelling(df[column])
+    return df
+
+def to_properties(df):
+    """
+    Rows as dicts for the Neo4j driver, with None for every missing value.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def _profile_text(properties):
+    return " ".join(f"{key}: {value}" for key, value in properties.items()
+                    if key not in EXCLUDED_FIELDS and value is not None)
+
+def _stored_properties(records):
+    """
+    What ends up on the node: NaN used to be stored, None never is.
+    """
+    return [{key: value for key, value in row.items() if value is not None} for row in records]
+
+def savings_report(raw_df, normalized_df):
+    """
+    Compare the stored node properties and the embedded profile text before
+    and after normalization. Returns per-profile averages.
+    """
+    before = raw_df.astype(object).where(raw_df.notna(), float("nan")).to_dict("records")
+    after = _stored_properties(to_properties(normalized_df))
+    profiles = max(len(before), 1)
+    bytes_before = sum(len(json.dumps(row, default=str)) for row in before)
+    bytes_after = sum(len(json.dumps(row, default=str)) for row in after)
+    text_before = [" ".join(f"{key}: {value}" for key, value in row.items() if key not in EXCLUDED_FIELDS)
+                   for row in before]
+    tokens_before = sum(len(TOKEN_PATTERN.findall(text)) for text in text_before)
+    tokens_after = sum(len(TOKEN_PATTERN.findall(_profile_text(row))) for row in after)
+    return {
+        "profiles": len(before),
+        "bytes_before": bytes_before / profiles,
+        "bytes_after": bytes_after / profiles,
+        "tokens_before": tokens_before / profiles,
+        "tokens_after": tokens_after / profiles,
+    }
+
+def print_savings(report):
+    print(f"Normalized {report['profiles']} profiles: "
+          f"{report['bytes_before']:.0f} -> {report['bytes_after']:.0f} bytes "
+          f"({report['bytes_before'] - report['bytes_after']:.0f} saved) and "
+          f"{report['tokens_before']:.1f} -> {report['tokens_after']:.1f} tokens "
+          f"({report['tokens_before'] - report['tokens_after']:.1f} saved) per profile.")
+
+def main():
+    paths = sorted(sys.argv[1:] or glob.glob(DATA_GLOB))
+    raw_df = load_class_lists(paths)
+    print_savings(savings_report(raw_df, normalize_class_list(raw_df)))
+
+if __name__ == "__main__":
+    main()
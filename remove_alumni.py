@@ -1,4 +1,5 @@
 from neo4j import GraphDatabase
+from corpus_version import bump_corpus_version, record_removals
 
 # ====== Neo4j Connection Configuration ======
 NEO4J_URI = "bolt://localhost:7687"
@@ -25,13 +26,16 @@ class GraphDB:
     def _remove_alumni_tx(tx, alumni_name):
         # The query uses DETACH DELETE to remove the node and all its relationships.
         query = """
-        MATCH (s:alumni {name: $name})
+        MATCH (s:Student {name: $name})
         DETACH DELETE s
         RETURN count(s) as removed
         """
         result = tx.run(query, name=alumni_name)
         record = result.single()
         removed = record["removed"] if record else 0
+        if removed:
+            # Leave a tombstone so the API drops the alumni (see corpus_version.py).
+            record_removals(tx, [alumni_name], bump_corpus_version(tx))
         return removed
 
     def remove_alumnis(self, alumni_names):
@@ -0,0 +1,182 @@
+# Schema bootstrap and label migration. Run once against an existing
+# database (and again whenever SCHEMA changes; every statement is idempotent):
+#   1. measures MERGE throughput on the current schema,
+#   2. moves nodes labelled `alumni` (written by older versions of
+#      add_alumni.py) onto `Student`, merging them into a Student of the same
+#      name when one exists, and merges duplicate Student names,
+#   3. creates the uniqueness constraints and property indexes below,
+#   4. measures MERGE throughput again.
+#
+# python schema_bootstrap.py [--no-bench]
+import sys
+import time
+from neo4j import GraphDatabase
+from corpus_version import bump_corpus_version, stamp_alumni
+
+# ====== Neo4j Connection Configuration ======
+NEO4J_URI = "bolt://localhost:7687"
+NEO4J_USER = "neo4j"
+NEO4J_PASSWORD = "password"
+
+# ====== Schema Configuration ======
+MIGRATION_BATCH_SIZE = 1000
+BENCH_NODES = 2000
+BENCH_PREFIX = "__schema_bench__"
+
+# (label, property) pairs that every MERGE / lookup keys on.
+UNIQUE_CONSTRAINTS = [
+    ("Student", "name"),
+    ("RemovedAlumni", "name"),
+    ("CorpusMeta", "id"),
+]
+# Filter fields (see FILTERABLE_FIELDS in flask_api/serve_profile.py)
+# and the properties the API reads changes by.
+PROPERTY_INDEXES = [
+    ("Student", "email"),
+    ("Student", "corpus_version"),
+    ("Student", "city"),
+    ("Student", "us_state"),
+    ("Student", "country"),
+    ("Student", "industry"),
+    ("Student", "function"),
+    ("Student", "major"),
+    ("Student", "employer"),
+    ("Student", "grad_school"),
+    ("Student", "class_year"),
+    ("Student", "cluster_id"),
+    ("RemovedAlumni", "corpus_version"),
+]
+
+class GraphDB:
+    def __init__(self, uri, user, password):
+        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+
+    def close(self):
+        self.driver.close()
+
+    def run_in_batches(self, tx_function):
+        """
+        Call tx_function in its own write transaction until it reports that it
+        touched no more nodes. Returns the total.
+        """
+        total = 0
+        with self.driver.session() as session:
+            while True:
+                count = session.execute_write(tx_function)
+                if not count:
+                    return total
+                total += count
+
+    @staticmethod
+    def _stamp_if_changed(tx, names, count):
+        # Only a batch that changed something bumps the corpus version, so a
+        # no-op run does not make every API instance reload.
+        if count:
+            stamp_alumni(tx, names, bump_corpus_version(tx))
+        return count
+
+    @staticmethod
+    def _merge_alumni_into_students_tx(tx):
+        query = (
+            "MATCH (a:alumni) WHERE NOT a:Student AND EXISTS { MATCH (:Student {name: a.name}) } "
+            "WITH a LIMIT $batch_size "
+            "MATCH (s:Student {name: a.name}) "
+            "SET s += properties(a) "
+            "DETACH DELETE a "
+            "RETURN collect(DISTINCT s.name) AS names, count(DISTINCT a) AS merged"
+        )
+        record = tx.run(query, batch_size=MIGRATION_BATCH_SIZE).single()
+        return GraphDB._stamp_if_changed(tx, record["names"], record["merged"])
+
+    @staticmethod
+    def _relabel_alumni_tx(tx):
+        query = (
+            "MATCH (a:alumni) "
+            "WITH a LIMIT $batch_size "
+            "SET a:Student "
+            "REMOVE a:alumni "
+            "RETURN collect(DISTINCT a.name) AS names, count(a) AS relabelled"
+        )
+        record = tx.run(query, batch_size=MIGRATION_BATCH_SIZE).single()
+        return GraphDB._stamp_if_changed(tx, record["names"], record["relabelled"])
+
+    @staticmethod
+    def _merge_duplicate_students_tx(tx):
+        query = (
+            "MATCH (s:Student) "
+            "WITH s.name AS name, collect(s) AS nodes WHERE name IS NOT NULL AND size(nodes) > 1 "
+            "WITH nodes LIMIT $batch_size "
+            "WITH head(nodes) AS keep, tail(nodes) AS duplicates "
+            "UNWIND duplicates AS duplicate "
+            "SET keep += properties(duplicate) "
+            "DETACH DELETE duplicate "
+            "RETURN collect(DISTINCT keep.name) AS names, count(duplicate) AS merged"
+        )
+        record = tx.run(query, batch_size=MIGRATION_BATCH_SIZE).single()
+        return GraphDB._stamp_if_changed(tx, record["names"], record["merged"])
+
+    def migrate_labels(self):
+        """
+        Put every alumni on the Student label with one node per name.
+        """
+        merged = self.run_in_batches(self._merge_alumni_into_students_tx)
+        relabelled = self.run_in_batches(self._relabel_alumni_tx)
+        duplicates = self.run_in_batches(self._merge_duplicate_students_tx)
+        return merged, relabelled, duplicates
+
+    def create_schema(self):
+        with self.driver.session() as session:
+            for label, prop in UNIQUE_CONSTRAINTS:
+                session.run(
+                    f"CREATE CONSTRAINT {label.lower()}_{prop}_unique IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+                ).consume()
+            for label, prop in PROPERTY_INDEXES:
+                session.run(
+                    f"CREATE INDEX {label.lower()}_{prop} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+                ).consume()
+            session.run("CALL db.awaitIndexes()").consume()
+
+    def bench_merges(self, num_nodes=BENCH_NODES):
+        """
+        MERGE num_nodes throwaway Student nodes one transaction at a time, the
+        way the populate scripts do, and return nodes per second. The nodes are
+        deleted afterwards and the corpus version is not touched.
+        """
+        query = "MERGE (s:Student {name: $name}) SET s.city = $city"
+        with self.driver.session() as session:
+            started = time.perf_counter()
+            for i in range(num_nodes):
+                session.execute_write(lambda tx: tx.run(query, name=f"{BENCH_PREFIX}{i}", city="Bench").consume())
+            elapsed = time.perf_counter() - started
+            session.run("MATCH (s:Student) WHERE s.name STARTS WITH $prefix DETACH DELETE s",
+                        prefix=BENCH_PREFIX).consume()
+        return num_nodes / elapsed
+
+    def count_students(self):
+        with self.driver.session() as session:
+            return session.run("MATCH (s:Student) RETURN count(s) AS n").single()["n"]
+
+def main():
+    bench = "--no-bench" not in sys.argv[1:]
+    db = GraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+
+    if bench:
+        print(f"Measuring MERGE throughput on {db.count_students()} Student nodes...")
+        before = db.bench_merges()
+
+    merged, relabelled, duplicates = db.migrate_labels()
+    print(f"Migrated 'alumni' nodes: {merged} merged into existing Students, {relabelled} relabelled; "
+          f"merged {duplicates} duplicate Student names.")
+
+    db.create_schema()
+    print(f"Ensured {len(UNIQUE_CONSTRAINTS)} uniqueness constraints and {len(PROPERTY_INDEXES)} property indexes.")
+
+    if bench:
+        after = db.bench_merges()
+        print(f"MERGE throughput: {before:.0f} -> {after:.0f} nodes/s ({after / before:.1f}x) "
+              f"over {BENCH_NODES} single-node transactions.")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,44 @@
 # thus, we need a function for finetuning our gpt. Another function for using that finetuned gpt to serve up the profiles that best match the prompt given by the user. And finally a last function to take natural language prompt as input and return the profiles that chatgpt serves up.
 
 import os
+import sys
 import json
+import time
+import numpy as np
 from neo4j import GraphDatabase
 from openai import OpenAI
 import openai
+from gpt_response_cache import ResponseCache, make_cache_key, fingerprint
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# OPENAI_BASE_URL can point the client at stub_completion_server.py for local runs.
+client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=os.environ.get("OPENAI_BASE_URL"))
 
 # ====== Neo4j Connection Configuration ======
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "password"
 
+# ====== Retrieval Configuration ======
+# "retrieval" puts only the RETRIEVAL_TOP_K nearest profiles from the local
+# vector index into the prompt; "full" sends every profile (the original behaviour).
+CONTEXT_MODE = "retrieval"
+RETRIEVAL_TOP_K = 25
+GPT_MODEL = "gpt-3.5-turbo"
+USE_RESPONSE_CACHE = True  # identical queries over an unchanged candidate set reuse the stored answer
+# Description embeddings are stored here and reused while the descriptions are unchanged.
+RETRIEVAL_EMBEDDINGS_FILE = "./output/retrieval_embeddings.npz"
+COMPARE_SAMPLE_QUERY = "find me other yale graduates from the class of 2020 that work on public policy in washington dc"
+
+# The Sentence Transformer model is only loaded when retrieval is used.
+model = None
+
+def get_model():
+    global model
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+    return model
+
 class GraphDB:
     def __init__(self, uri, user, password):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
@@ -53,29 +79,138 @@ def fine_tune_gpt(alumni_profiles):
     context = "\n".join(context_lines)
     return context
 
-def serve_profiles(nl_prompt, alumni_context):
+def load_description_embeddings(descriptions, path=RETRIEVAL_EMBEDDINGS_FILE):
     """
-    Given a natural language prompt and the alumni context string, generate a response
-    using the ChatGPT API that returns the names of alumni that best match the query.
+    Normalized embeddings of the descriptions, read from path when it was
+    written for exactly these descriptions, otherwise encoded and stored there.
     """
-    system_prompt = (
-        "You are an expert at matching alumni profiles to user queries. You are specifically good as providing precise matches. You specifically match keywords from the user's prompt to keywords in alumni profiles."
-        "Below is a list of alumni profiles (each line contains the alumni's name and a short description). "
-        "Based on the user's query, return only the names of the alumni that best match and an explanation of why they were selected. Be sure to only serve up profiles that are relevant to the user query."
-        "Separate the names with commas.\n\n"
-        "Alumni Profiles:\n" + alumni_context
-    )
+    key = fingerprint(json.dumps(descriptions))
+    try:
+        stored = np.load(path)
+        if str(stored["fingerprint"]) == key:
+            return stored["embeddings"]
+    except FileNotFoundError:
+        pass
+    embeddings = get_model().encode(descriptions)
+    embeddings = (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype('float32')
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, fingerprint=key, embeddings=embeddings)
+    return embeddings
 
-    user_prompt = f"User Query: {nl_prompt}\n\nReturn only the names of the best matching alumni which share direct keywords with the user prompt."
+def build_retrieval_index(alumni_profiles):
+    """
+    Build a FAISS inner-product index over the normalized embeddings of each
+    alumni's description. Row i of the index is alumni_profiles[i]. Only a
+    changed corpus is re-encoded (see load_description_embeddings).
+    """
+    import faiss
 
-    response = client.chat.completions.create(model="gpt-3.5-turbo",  # Use the cost-effective model.
+    descriptions = [profile.get("description", "") for profile in alumni_profiles]
+    embeddings = load_description_embeddings(descriptions)
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    return index
+
+def retrieve_candidates(nl_query, alumni_profiles, index, top_k=RETRIEVAL_TOP_K):
+    """
+    Return the top_k alumni profiles closest to the query in the local vector index.
+    """
+    query_embedding = get_model().encode([nl_query])
+    query_embedding = query_embedding / np.linalg.norm(query_embedding, axis=1, keepdims=True)
+    _, indices = index.search(query_embedding.astype('float32'), min(top_k, index.ntotal))
+    return [alumni_profiles[idx] for idx in indices[0] if idx >= 0]
+
+SYSTEM_PROMPT_TEMPLATE = (
+    "You are an expert at matching alumni profiles to user queries. You are specifically good as providing precise matches. You specifically match keywords from the user's prompt to keywords in alumni profiles."
+    "Below is a list of alumni profiles (each line contains the alumni's name and a short description). "
+    "Based on the user's query, return only the names of the alumni that best match and an explanation of why they were selected. Be sure to only serve up profiles that are relevant to the user query."
+    "Separate the names with commas.\n\n"
+    "Alumni Profiles:\n{alumni_context}"
+)
+
+USER_PROMPT_TEMPLATE = "User Query: {nl_prompt}\n\nReturn only the names of the best matching alumni which share direct keywords with the user prompt."
+
+def request_matches(nl_prompt, alumni_context):
+    """
+    Send the matching prompt to the ChatGPT API and return the raw response,
+    which carries the token usage alongside the answer.
+    """
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(alumni_context=alumni_context)
+    user_prompt = USER_PROMPT_TEMPLATE.format(nl_prompt=nl_prompt)
+
+    response = client.chat.completions.create(model=GPT_MODEL,  # Use the cost-effective model.
     messages=[
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ],
     temperature=0.0,
     max_tokens=150)
-    return response.choices[0].message.content.strip()
+    return response
+
+def cached_request_matches(nl_prompt, alumni_context, cache=None):
+    """
+    Like request_matches, but answered from the response cache when the same
+    normalized prompt was already sent with the same candidates, model,
+    prompt template and API base URL. Returns (answer, prompt_tokens, cache_hit).
+    """
+    key = None
+    if cache is not None:
+        key = make_cache_key(nl_prompt, alumni_context, GPT_MODEL, SYSTEM_PROMPT_TEMPLATE + USER_PROMPT_TEMPLATE,
+                             str(client.base_url))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached["response"], cached["prompt_tokens"], True
+
+    response = request_matches(nl_prompt, alumni_context)
+    answer = response.choices[0].message.content.strip()
+    prompt_tokens = response.usage.prompt_tokens
+    if cache is not None:
+        cache.put(key, answer, prompt_tokens)
+    return answer, prompt_tokens, False
+
+def serve_profiles(nl_prompt, alumni_context, cache=None):
+    """
+    Given a natural language prompt and the alumni context string, generate a response
+    using the ChatGPT API that returns the names of alumni that best match the query.
+    """
+    answer, _, _ = cached_request_matches(nl_prompt, alumni_context, cache)
+    return answer
+
+def match_profiles(nl_query, prompt, alumni_profiles, index=None, mode=CONTEXT_MODE, top_k=RETRIEVAL_TOP_K, cache=None):
+    """
+    Run one query end to end in the given context mode. Retrieval (when used)
+    is keyed on the bare nl_query; the full prompt is what GPT sees.
+    Returns a dict with the answer, prompt token count, number of profiles in
+    the prompt, whether the answer came from the cache and end-to-end latency in seconds.
+    """
+    started = time.perf_counter()
+    if mode == "retrieval":
+        candidates = retrieve_candidates(nl_query, alumni_profiles, index, top_k)
+    else:
+        candidates = alumni_profiles
+    answer, prompt_tokens, cache_hit = cached_request_matches(prompt, fine_tune_gpt(candidates), cache)
+    return {
+        "result": answer,
+        "prompt_tokens": prompt_tokens,
+        "num_profiles": len(candidates),
+        "cache_hit": cache_hit,
+        "latency": time.perf_counter() - started,
+    }
+
+def compare_context_modes(queries, alumni_profiles, index, top_k=RETRIEVAL_TOP_K, index_seconds=0.0):
+    """
+    Print prompt tokens and end-to-end latency per query for the full-context
+    mode versus the retrieval-narrowed mode. index_seconds (the one-off index
+    build) is reported separately since every retrieval query shares it.
+    """
+    print(f"\nRetrieval index built in {index_seconds:.2f}s")
+    print(f"\n{'query':<50} {'mode':<10} {'profiles':>8} {'tokens':>8} {'latency s':>10}")
+    for nl_query in queries:
+        for mode in ["full", "retrieval"]:
+            report = match_profiles(nl_query, nl_query, alumni_profiles, index, mode=mode, top_k=top_k)
+            print(f"{nl_query[:50]:<50} {mode:<10} {report['num_profiles']:>8} "
+                  f"{report['prompt_tokens']:>8} {report['latency']:>10.2f}")
 
 def main():
     nl_query = "find me investment bankers in New York who work at Goldman Sachs. Only show me bankers that work at goldman sachs in your response.'"
@@ -93,14 +228,35 @@ def main():
         print("No alumni profiles found in the database.")
         return
 
-    # Build the GPT context string from alumni profiles.
-    alumni_context = fine_tune_gpt(alumni_profiles)
+    compare = "--compare" in sys.argv
+    index = None
+    index_seconds = 0.0
+    if CONTEXT_MODE == "retrieval" or compare:
+        started = time.perf_counter()
+        index = build_retrieval_index(alumni_profiles)
+        index_seconds = time.perf_counter() - started
+
+    if compare:
+        compare_context_modes([nl_query, COMPARE_SAMPLE_QUERY], alumni_profiles, index, index_seconds=index_seconds)
+        return
+
+    cache = ResponseCache() if USE_RESPONSE_CACHE and "--no-cache" not in sys.argv else None
 
-    # Get the response from GPT.
-    result = serve_profiles(prompt, alumni_context)
+    # Build the GPT context string from the candidate alumni profiles and get the response from GPT.
+    report = match_profiles(nl_query, prompt, alumni_profiles, index, mode=CONTEXT_MODE, cache=cache)
+    # This run paid for the index build, so it counts towards its latency.
+    report["latency"] += index_seconds
 
     print("\nMatching Alumni:")
-    print(result)
+    print(report["result"])
+    print(f"\n({report['num_profiles']} profiles in prompt, {report['prompt_tokens']} prompt tokens, "
+          f"{'cache hit' if report['cache_hit'] else 'cache miss'}, {report['latency']:.2f}s end to end "
+          f"including {index_seconds:.2f}s index build)")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Response cache: {stats['entries']} entries, {stats['hits']} hits / {stats['misses']} misses "
+              f"(hit rate {stats['hit_rate']:.0%}), {stats['evictions']} evictions")
+        cache.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,83 @@
+# A local stand-in for the OpenAI chat completions API, so the GPT matcher and
+# its response cache can be exercised without network access or API costs.
+#
+#   python stub_completion_server.py
+#   OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub python serve_profiles_gpt.py
+
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ====== Stub Server Configuration ======
+HOST = "127.0.0.1"
+PORT = 8001
+RESPONSE_DELAY_SECONDS = 0.5  # simulated completion latency
+
+class StubCompletionHandler(BaseHTTPRequestHandler):
+    request_count = 0
+    _count_lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self._count_lock:
+            StubCompletionHandler.request_count += 1
+
+        messages = body.get("messages", [])
+        # Whitespace-separated words are a rough stand-in for tokens.
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+        answer = f"stub answer #{StubCompletionHandler.request_count}"
+        time.sleep(RESPONSE_DELAY_SECONDS)
+
+        payload = {
+            "id": f"chatcmpl-stub-{StubCompletionHandler.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(answer.split()),
+                "total_tokens": prompt_tokens + len(answer.split()),
+            },
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(host=HOST, port=PORT):
+    """
+    Start the stub server in a background thread and return it; call
+    server.shutdown() to stop it. Pass port=0 to pick a free port.
+    """
+    server = ThreadingHTTPServer((host, port), StubCompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    server = ThreadingHTTPServer((HOST, port), StubCompletionHandler)
+    print(f"Stub completion server listening on http://{HOST}:{port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()